@@ -0,0 +1,102 @@
+# backend/cache.py
+"""
+Versioned caching for read-heavy endpoints.
+
+Cached values are keyed by the current version of every entity they were
+built from ('exam', 'question', 'user', 'attempt:<teacher id>', ...). Model
+signals bump those versions, so a change makes old entries unreachable
+and they age out through the backend's TTL / LRU culling.
+
+The versions are kept in the 'versions' cache, which every worker shares
+even when the values themselves are cached per process.
+"""
+import hashlib
+import threading
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+from .db_routers import current_read_alias
+
+
+VERSION_KEY = 'cache:version:{}'
+
+_MISSING = object()
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+
+def get_versions(entities):
+    """Current version of each entity, creating any that are missing"""
+    versions_cache = caches['versions']
+    keys = [VERSION_KEY.format(entity) for entity in entities]
+    found = versions_cache.get_many(keys)
+
+    versions = []
+    for key in keys:
+        if key not in found:
+            found[key] = versions_cache.get_or_set(key, _new_version, None)
+        versions.append(found[key])
+    return versions
+
+
+def _new_version():
+    # Random rather than a counter: a plain set() can't lose a concurrent
+    # bump the way a non-atomic incr() can, and a lost key never comes
+    # back with an old version
+    return uuid.uuid4().hex
+
+
+def bump_version(*entities):
+    """Invalidate everything cached from these entities"""
+    caches['versions'].set_many({VERSION_KEY.format(entity): _new_version() for entity in entities}, None)
+
+
+def cached(namespace, key_parts, depends_on, build, timeout=None):
+    """
+    Return the cached value for (namespace, key_parts) at the current
+    versions of depends_on, calling build() and storing its result on a miss.
+    """
+    parts = [str(part) for part in key_parts]
+    parts += [str(version) for version in get_versions(depends_on)]
+    read_alias = current_read_alias()
+    if read_alias:
+        # Replica reads can lag, so keep them apart from primary-built entries
+        parts.append(read_alias)
+    suffix = ':'.join(parts)
+    if len(suffix) > 150:
+        suffix = hashlib.sha256(suffix.encode()).hexdigest()
+    key = f'cache:{namespace}:{suffix}'
+
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        _record(namespace, 'misses')
+        value = build()
+        cache.set(key, value, settings.CACHE_TIMEOUT if timeout is None else timeout)
+    else:
+        _record(namespace, 'hits')
+    return value
+
+
+def _record(namespace, outcome):
+    with _stats_lock:
+        _stats[namespace][outcome] += 1
+
+
+def stats():
+    """Hit/miss counts per namespace for this process"""
+    with _stats_lock:
+        snapshot = {namespace: dict(counts) for namespace, counts in _stats.items()}
+
+    for counts in snapshot.values():
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else 0
+    return snapshot
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,208 @@
+# backend/db_routers.py
+"""
+Read-replica routing for reporting reads.
+
+Everything goes to 'default' unless the code runs inside replica_reads()
+(or a view wrapped in reporting_view), in which case reads go to the
+REPLICA_DB_ALIAS connection. Writes always go to the primary.
+
+The replica is skipped, and reads stay on the primary, when:
+  - no replica is configured,
+  - the client made a mutation of its own in the last REPLICA_PIN_SECONDS
+    (recorded by ReadYourWritesMiddleware in the shared 'versions' cache,
+    keyed by client_key()),
+  - the replica is more than REPLICA_MAX_LAG seconds behind, or can't be
+    reached at all.
+
+Results cached while reading from the replica are stored apart from
+primary-built ones (backend/cache.py), so a pinned client never gets a
+lagging copy back from the cache.
+"""
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_KEY = 'replica:pin:{}'
+
+# How long a measured replica lag is trusted before it is checked again
+LAG_CHECK_INTERVAL = 2.0
+
+_read_alias = ContextVar('read_alias', default=None)
+
+_lag_lock = threading.Lock()
+_lag_checked_at = 0.0
+_lag_ok = False
+
+
+def current_read_alias():
+    """The alias reads are routed to right now, None for the primary"""
+    return _read_alias.get()
+
+
+def replica_alias():
+    alias = getattr(settings, 'REPLICA_DB_ALIAS', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def measure_replica_lag(alias):
+    """Seconds the replica is behind the primary (0 when it can't tell)"""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN pg_is_in_recovery() "
+            "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+            "ELSE 0 END"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def replica_is_fresh(alias):
+    """Whether the replica is within REPLICA_MAX_LAG, re-checked at most every LAG_CHECK_INTERVAL"""
+    global _lag_checked_at, _lag_ok
+
+    now = time.monotonic()
+    if now - _lag_checked_at < LAG_CHECK_INTERVAL:
+        return _lag_ok
+
+    with _lag_lock:
+        if now - _lag_checked_at >= LAG_CHECK_INTERVAL:
+            try:
+                lag = measure_replica_lag(alias)
+                _lag_ok = lag <= settings.REPLICA_MAX_LAG
+                if not _lag_ok:
+                    logger.warning("Replica %s is %.1fs behind, reading from the primary", alias, lag)
+            except DatabaseError:
+                logger.exception("Replica %s is unreachable, reading from the primary", alias)
+                _lag_ok = False
+            _lag_checked_at = time.monotonic()
+        return _lag_ok
+
+
+def client_key(request, user=None):
+    """
+    Who a request comes from, for read-your-writes pinning: the logged-in
+    user, else the user_id it passes (all the frontend sends), else its
+    address.
+    """
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+
+    user_id = request.GET.get('user_id') or getattr(request, 'body_user_id', None)
+    if user_id:
+        return f'user:{user_id}'
+    return f"addr:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def is_pinned(request):
+    user = getattr(request, 'user', None)
+    return caches['versions'].get(PIN_KEY.format(client_key(request, user))) is not None
+
+
+@contextmanager
+def replica_reads(request=None):
+    """
+    Route reads inside the block to the replica when it's safe to.
+    Passing the request keeps a client that just wrote on the primary.
+    """
+    alias = replica_alias()
+    if alias and request is not None and is_pinned(request):
+        alias = None
+    if alias and not replica_is_fresh(alias):
+        alias = None
+
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+def reporting_view(view):
+    """Serve a read-only view from the replica, see replica_reads()"""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads(request):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return current_read_alias()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db == 'default'
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful mutation, pin the client's reporting reads to the
+    primary for REPLICA_PIN_SECONDS so it sees its own change.
+
+    The pin is kept on the server rather than in a cookie: the frontend
+    calls the API cross-site without credentials, so cookies never come back.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        writes = self.start(request)
+        response = self.get_response(request)
+        if writes and response.status_code < 400:
+            caches['versions'].set(
+                PIN_KEY.format(client_key(request, request.user)), 1, settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    async def __acall__(self, request):
+        writes = self.start(request)
+        response = await self.get_response(request)
+        if writes and response.status_code < 400:
+            await caches['versions'].aset(
+                PIN_KEY.format(client_key(request, await request.auser())), 1, settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    def start(self, request):
+        """Whether the request may write; notes the user_id of a JSON body before the view reads it"""
+        if not replica_alias() or request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return False
+
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                data = None
+            if isinstance(data, dict) and data.get('user_id'):
+                request.body_user_id = data['user_id']
+        return True
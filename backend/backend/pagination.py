@@ -0,0 +1,205 @@
+# backend/pagination.py
+"""
+Keyset (cursor) pagination and streaming exports for list endpoints.
+
+A page is fetched with a WHERE on the ordering columns of the last row
+already seen instead of an OFFSET, so every page costs the same index
+range scan however deep into the list it is. The ordering must end in a
+unique column so the position between two rows is never ambiguous.
+
+Full dumps go through stream_rows(), which writes rows from a database
+iterator one at a time so memory use doesn't grow with the table, and
+bulk uploads in the same formats are read back lazily by read_rows().
+"""
+import base64
+import csv
+import datetime
+import io
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+STREAM_FORMATS = ('csv', 'tsv', 'ndjson')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'tsv': 'text/tab-separated-values',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+# Upload file extension -> format read by read_rows()
+ROW_FILE_FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+
+class RowFileError(ValueError):
+    """Raised when an uploaded file of rows can't be read at all"""
+
+
+class CursorError(ValueError):
+    """Raised for a cursor or page size the client made up or mangled"""
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder rounds to milliseconds, which would skip or
+        # repeat rows whose timestamps differ only below that
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    data = json.dumps(values, cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise CursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != length:
+        raise CursorError("Invalid cursor")
+    return values
+
+
+def page_size_from(params):
+    """The page_size query parameter, clamped to MAX_PAGE_SIZE"""
+    try:
+        size = int(params.get('page_size', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise CursorError("page_size must be a number")
+    if size < 1:
+        raise CursorError("page_size must be positive")
+    return min(size, MAX_PAGE_SIZE)
+
+
+def _after(ordering, values):
+    """Q for the rows that come after values in ordering"""
+    condition = Q()
+    for position in reversed(range(len(ordering))):
+        field = ordering[position].lstrip('-')
+        lookup = 'lt' if ordering[position].startswith('-') else 'gt'
+        step = Q(**{f'{field}__{lookup}': values[position]})
+        if position < len(ordering) - 1:
+            step |= Q(**{field: values[position]}) & condition
+        condition = step
+    return condition
+
+
+def _value(row, field):
+    if isinstance(row, dict):
+        return row[field]
+    for name in field.split('__'):
+        row = getattr(row, name)
+    return row
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    One page of queryset in ordering (a list of field names, '-' for
+    descending, ending in a unique field), starting after cursor.
+
+    Rows may be model instances or values() dicts that include the
+    ordering fields. Returns (rows, cursor of the next page or None).
+    """
+    if cursor:
+        try:
+            queryset = queryset.filter(_after(ordering, decode_cursor(cursor, len(ordering))))
+        except (ValidationError, TypeError, ValueError):
+            # Values that don't fit the columns (CursorError is a ValueError too)
+            raise CursorError("Invalid cursor")
+
+    rows = list(queryset.order_by(*ordering)[:page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor([_value(last, field.lstrip('-')) for field in ordering])
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer"""
+    def write(self, value):
+        return value
+
+
+def stream_rows(fields, rows, fmt):
+    """Yield rows (tuples in fields order) as CSV or TSV with a header, or as NDJSON"""
+    if fmt == 'ndjson':
+        for values in rows:
+            yield json.dumps(dict(zip(fields, values)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+        return
+
+    writer = csv.writer(_Echo(), delimiter='\t' if fmt == 'tsv' else ',')
+    yield writer.writerow(fields)
+    for values in rows:
+        yield writer.writerow(values)
+
+
+def detect_row_format(filename, fmt=None, formats=ROW_FILE_FORMATS):
+    """The format named by fmt, or else by filename's extension in formats"""
+    if fmt:
+        fmt = fmt.lower()
+        if fmt not in formats.values():
+            raise RowFileError(f"Unsupported format: {fmt}")
+        return fmt
+
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in formats:
+        raise RowFileError(
+            f"Can't tell the format of '{filename}'; use one of {', '.join(sorted(formats))}"
+        )
+    return formats[extension]
+
+
+def check_columns(header, required):
+    missing = [field for field in required if field not in header]
+    if missing:
+        raise RowFileError(f"Missing column(s): {', '.join(missing)}")
+
+
+def read_rows(stream, fmt, required=()):
+    """
+    Yield (row number, dict) from a binary CSV, TSV or JSON Lines stream.
+    JSON lines that aren't objects come back as None, for the caller to
+    report; CSV and TSV files must have the required columns.
+    """
+    try:
+        yield from _read_text_rows(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''), fmt, required)
+    except UnicodeDecodeError:
+        # Decoding is lazy, so this can come from any line
+        raise RowFileError("The file isn't UTF-8 text; save or export it as UTF-8 and try again")
+
+
+def _read_text_rows(text, fmt, required):
+    if fmt == 'jsonl':
+        for number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else None
+        return
+
+    reader = csv.DictReader(text, delimiter='\t' if fmt == 'tsv' else ',')
+    check_columns(reader.fieldnames or [], required)
+    for row in reader:
+        # Row numbers count the header line, to match what a spreadsheet shows
+        yield reader.line_num, row
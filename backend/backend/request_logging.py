@@ -0,0 +1,190 @@
+# backend/request_logging.py
+"""
+Structured, non-blocking logging.
+
+Records are formatted as one JSON object per line and written by a
+background thread: BackgroundHandler only puts them on a bounded queue,
+so a request never waits on stdout, and a full queue drops records
+instead of stalling. RequestLogMiddleware gives every request a
+correlation id (taken from X-Request-ID or generated) that is stamped
+on each record logged while it runs, and logs one line per request.
+High-volume endpoints can be sampled with LOG_SAMPLE_RATES: a request
+that isn't sampled drops its INFO and DEBUG records, but warnings and
+errors always get through.
+"""
+import copy
+import datetime
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Ids accepted from clients; anything else is replaced with a fresh one
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+_request_id = ContextVar('request_id', default=None)
+_sampled = ContextVar('log_sampled', default=True)
+
+# LogRecord's own attributes; anything else on a record came from extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'request_id', 'taskName',
+    # Django's request loggers attach the HttpRequest itself
+    'request',
+}
+
+logger = logging.getLogger('backend.requests')
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the id of the request being handled"""
+    def filter(self, record):
+        request_id = _request_id.get()
+        if request_id is None:
+            # django.request logs a response's status after the middleware
+            # has returned, but passes the request along
+            request_id = getattr(getattr(record, 'request', None), 'request_id', None)
+        record.request_id = request_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Drop INFO and DEBUG records of requests left out of the sample"""
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or _sampled.get()
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Queue records for a listener thread that formats and writes them.
+    The formatter set on this handler is used by the writing thread.
+    """
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+        # Records lost to a full queue
+        self.dropped = 0
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Only resolve the message here, while its args are still current;
+        # JSON encoding and tracebacks are left to the listener thread
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        # Drains the queue before the stream goes away
+        self.listener.stop()
+        super().close()
+
+
+def view_path(view_func):
+    """Dotted path of a view, seeing through DRF's @api_view wrapper"""
+    view = getattr(view_func, 'view_class', view_func)
+    return f'{view.__module__}.{view.__name__}'
+
+
+class RequestLogMiddleware:
+    """Assign each request a correlation id and log it once it is answered"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        tokens = self.start(request)
+        try:
+            response = self.get_response(request)
+            self.finish(request, response)
+        finally:
+            self.reset(tokens)
+        return response
+
+    async def __acall__(self, request):
+        tokens = self.start(request)
+        try:
+            response = await self.get_response(request)
+            self.finish(request, response)
+        finally:
+            self.reset(tokens)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.log_view = view_path(view_func)
+        rate = settings.LOG_SAMPLE_RATES.get(request.log_view)
+        if rate is not None:
+            _sampled.set(random.random() < rate)
+
+    def start(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        request.log_started = time.monotonic()
+        return _request_id.set(request_id), _sampled.set(True)
+
+    def finish(self, request, response):
+        response[REQUEST_ID_HEADER] = request.request_id
+
+        status = response.status_code
+        level = logging.ERROR if status >= 500 else logging.WARNING if status >= 400 else logging.INFO
+        logger.log(level, "%s %s %s", request.method, request.path, status, extra={
+            'method': request.method,
+            'path': request.path,
+            'status': status,
+            'view': getattr(request, 'log_view', None),
+            'duration_ms': round((time.monotonic() - request.log_started) * 1000, 1),
+        })
+
+    def reset(self, tokens):
+        _request_id.reset(tokens[0])
+        _sampled.reset(tokens[1])
@@ -10,6 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,12 +49,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.request_logging.RequestLogMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'backend.db_routers.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -60,6 +65,8 @@ CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:4200",
 ]
+# Lets the frontend quote a request's correlation id
+CORS_EXPOSE_HEADERS = ['X-Request-ID']
 
 
 REST_FRAMEWORK = {
@@ -94,14 +101,165 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# EXAMPRO_DB_ENGINE selects the profile: 'sqlite' (default, single node) or
+# 'postgres' (needs psycopg). SQLite runs in WAL mode so readers never block
+# the writer, with synchronous=NORMAL, a memory-mapped read path and a busy
+# timeout; write transactions take the lock up front (BEGIN IMMEDIATE) so two
+# requests never deadlock upgrading a read lock. EXAMPRO_SQLITE_WAL=0 restores
+# SQLite's default rollback journal. PostgreSQL keeps connections open for
+# EXAMPRO_DB_CONN_MAX_AGE seconds with health checks, or hands them out from a
+# psycopg_pool pool when EXAMPRO_DB_POOL=1 (needs psycopg[pool]).
+
+DB_ENGINE = os.environ.get('EXAMPRO_DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('EXAMPRO_DB_CONN_MAX_AGE', 60))
+DB_POOL = os.environ.get('EXAMPRO_DB_POOL', '0') == '1'
+
+SQLITE_WAL = os.environ.get('EXAMPRO_SQLITE_WAL', '1') == '1'
+SQLITE_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA temp_store=MEMORY',
+]
 
-DATABASES = {
-    'default': {
+DATABASE_PROFILES = {
+    'sqlite': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('EXAMPRO_SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            'timeout': int(os.environ.get('EXAMPRO_SQLITE_TIMEOUT', 20)),
+            **({
+                'init_command': '; '.join(SQLITE_PRAGMAS),
+                'transaction_mode': 'IMMEDIATE',
+            } if SQLITE_WAL else {
+                # WAL mode sticks to the database file once set, so switch it back
+                'init_command': 'PRAGMA journal_mode=DELETE',
+            }),
+        },
+    },
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('EXAMPRO_DB_NAME', 'exampro'),
+        'USER': os.environ.get('EXAMPRO_DB_USER', 'exampro'),
+        'PASSWORD': os.environ.get('EXAMPRO_DB_PASSWORD', ''),
+        'HOST': os.environ.get('EXAMPRO_DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('EXAMPRO_DB_PORT', '5432'),
+        # Django refuses persistent connections on top of a pool
+        'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            **({'pool': {
+                'min_size': int(os.environ.get('EXAMPRO_DB_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('EXAMPRO_DB_POOL_MAX', 20)),
+                'timeout': 10,
+            }} if DB_POOL else {}),
+        },
+    },
+}
+
+DATABASES = {
+    'default': DATABASE_PROFILES[DB_ENGINE],
+}
+
+# Optional read replica for reporting views (see backend/db_routers.py):
+# EXAMPRO_DB_REPLICA_HOST for PostgreSQL, EXAMPRO_SQLITE_REPLICA_PATH for a
+# replicated SQLite file. Reporting reads fall back to the primary when the
+# replica is more than EXAMPRO_REPLICA_MAX_LAG seconds behind, and for
+# EXAMPRO_REPLICA_PIN_SECONDS after a client's own write (tracked per user
+# in the shared 'versions' cache below).
+
+REPLICA_DB_ALIAS = 'replica'
+REPLICA_MAX_LAG = float(os.environ.get('EXAMPRO_REPLICA_MAX_LAG', 5))
+REPLICA_PIN_SECONDS = int(os.environ.get('EXAMPRO_REPLICA_PIN_SECONDS', 10))
+
+if DB_ENGINE == 'postgres' and os.environ.get('EXAMPRO_DB_REPLICA_HOST'):
+    DATABASES[REPLICA_DB_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': os.environ['EXAMPRO_DB_REPLICA_HOST'],
+        'PORT': os.environ.get('EXAMPRO_DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
     }
+elif DB_ENGINE == 'sqlite' and os.environ.get('EXAMPRO_SQLITE_REPLICA_PATH'):
+    DATABASES[REPLICA_DB_ALIAS] = {
+        **DATABASES['default'],
+        'NAME': os.environ['EXAMPRO_SQLITE_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['backend.db_routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# EXAMPRO_CACHE_BACKEND selects the backend: 'locmem' (default, per process,
+# LRU-culled at MAX_ENTRIES), 'file' (shared by processes on one host) or
+# 'redis' (shared by every node; needs the redis package). Entries expire
+# after EXAMPRO_CACHE_TIMEOUT seconds and are also invalidated through the
+# version counters in backend/cache.py.
+#
+# A write only invalidates entries in workers that see its version bump, so
+# the counters live in the 'versions' cache, which must be shared by every
+# worker: a file cache on this host (under EXAMPRO_CACHE_DIR), or redis
+# when that is the backend. Running on more than one node therefore
+# needs EXAMPRO_CACHE_BACKEND=redis, or entries stay stale on the other
+# nodes until their TTL runs out.
+
+CACHE_TIMEOUT = int(os.environ.get('EXAMPRO_CACHE_TIMEOUT', 300))
+CACHE_MAX_ENTRIES = int(os.environ.get('EXAMPRO_CACHE_MAX_ENTRIES', 10000))
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'exampro',
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'EXAMPRO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'exampro-cache')
+        ),
+        'OPTIONS': {'MAX_ENTRIES': CACHE_MAX_ENTRIES},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('EXAMPRO_REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
 }
 
+CACHE_BACKEND = os.environ.get('EXAMPRO_CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        'TIMEOUT': CACHE_TIMEOUT,
+    },
+    'versions': {
+        **(CACHE_BACKENDS['redis'] if CACHE_BACKEND == 'redis' else {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(CACHE_BACKENDS['file']['LOCATION'], 'versions'),
+        }),
+        'TIMEOUT': None,
+    },
+}
+
+
+# Pre-rendered question papers are also stored gzip-compressed and served
+# that way to clients that send Accept-Encoding: gzip
+QUESTION_PAPER_GZIP = os.environ.get('EXAMPRO_QUESTION_PAPER_GZIP', '1') == '1'
+
+
+# How saved answers are stored: 'rows' (one Answer row per question) or
+# 'packed' (3 bits per question on ExamAttempt.packed_answers, see
+# exams/packing.py). Run `manage.py pack_answers` before switching to packed.
+ANSWER_STORAGE = os.environ.get('EXAMPRO_ANSWER_STORAGE', 'rows')
+
+
+# Worker processes used to hash passwords during bulk user provisioning
+# (users/provisioning.py); 0 uses one per CPU, 1 hashes in-process
+PASSWORD_HASH_WORKERS = int(os.environ.get('EXAMPRO_PASSWORD_HASH_WORKERS', 0))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -143,3 +301,56 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Logging: JSON lines on stdout, written from a background thread (see
+# backend/request_logging.py). EXAMPRO_LOG_FORMAT=text is easier to read
+# in a terminal. Test runs only log warnings unless told otherwise.
+
+LOG_LEVEL = os.environ.get(
+    'EXAMPRO_LOG_LEVEL', 'WARNING' if sys.argv[1:2] == ['test'] else 'INFO'
+).upper()
+LOG_FORMAT = os.environ.get('EXAMPRO_LOG_FORMAT', 'json')
+
+# Share of requests to these views whose INFO/DEBUG records are kept;
+# warnings and errors are always logged
+LOG_SAMPLE_RATES = {
+    'proctoring.views.log_event': 0.01,
+    'proctoring.views.log_event_batch': 0.05,
+    'proctoring.async_views.log_event': 0.01,
+    'exams.views.autosave_exam': 0.05,
+    'exams.views.exam_questions': 0.1,
+    'exams.async_views.exam_questions': 0.1,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_context': {'()': 'backend.request_logging.RequestContextFilter'},
+        'sampling': {'()': 'backend.request_logging.SamplingFilter'},
+    },
+    'formatters': {
+        'json': {'()': 'backend.request_logging.JSONFormatter'},
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'},
+    },
+    'handlers': {
+        'background': {
+            'class': 'backend.request_logging.BackgroundHandler',
+            'formatter': LOG_FORMAT,
+            'filters': ['request_context', 'sampling'],
+        },
+    },
+    'root': {
+        'handlers': ['background'],
+        'level': LOG_LEVEL,
+    },
+    'loggers': {
+        # Replaces Django's own console handler, so errors aren't logged twice
+        'django': {
+            'handlers': ['background'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
@@ -23,6 +23,9 @@ urlpatterns = [
     path('api/auth/', include('users.urls')),
     path('api/exams/', include('exams.urls')),
     path('api/proctor/', include('proctoring.urls')),
+    # Async exam-taking endpoints for ASGI deployments
+    path('api/async/exams/', include('exams.async_urls')),
+    path('api/async/proctor/', include('proctoring.async_urls')),
     path('api/admin/', include('users.admin_urls')),
     path('api/admin/', include('exams.admin_urls')),
     path('api/teacher/', include('exams.teacher_urls')),  
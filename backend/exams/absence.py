@@ -0,0 +1,109 @@
+# exams/absence.py
+import time
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from users.models import UserProfile
+from .catalogue import bump_attempt_versions
+from .models import Exam, ExamAttempt, JobWatermark
+from .scheduler import SUBMIT_GRACE, close_expired_attempts, process_due_attempts
+
+
+ABSENCE_JOB = 'mark_absent_students'
+
+
+def eligible_students(exam):
+    students = UserProfile.objects.filter(
+        role='student',
+        department=exam.department
+    )
+    if exam.allowed_batch:
+        students = students.filter(batch=exam.allowed_batch)
+    return students
+
+
+def mark_exam_absentees(exam):
+    """
+    Close out one expired exam: create absent attempts for eligible students
+    who never started it, and grade the saved answers of any attempt still
+    open (they were started, so they aren't absences).
+
+    Returns (created, closed) row counts.
+    """
+    has_attempt = ExamAttempt.objects.filter(exam=exam, student=OuterRef('pk'))
+    missing_ids = list(
+        eligible_students(exam).filter(~Exists(has_attempt)).values_list('id', flat=True)
+    )
+
+    absent = ExamAttempt.objects.filter(exam=exam, status='absent')
+
+    with transaction.atomic():
+        # ignore_conflicts rows (a student who started meanwhile) still come
+        # back from bulk_create(), so count what was actually inserted
+        absent_before = absent.count()
+        ExamAttempt.objects.bulk_create(
+            [
+                ExamAttempt(
+                    student_id=student_id,
+                    exam=exam,
+                    status='absent',
+                    is_submitted=True,
+                    score=0,
+                    end_time=exam.end_time
+                )
+                for student_id in missing_ids
+            ],
+            batch_size=1000,
+            ignore_conflicts=True
+        )
+        created = absent.count() - absent_before
+        # Normally the scheduler has closed these already
+        closed = close_expired_attempts(
+            ExamAttempt.objects.filter(exam=exam, is_submitted=False)
+            .select_related('exam')
+            .select_for_update(of=('self',))
+        )
+
+    # bulk_create() skips the model signals
+    if created:
+        bump_attempt_versions(exam.created_by_id)
+
+    return created, closed
+
+
+def mark_absent_for_closed_exams(full=False):
+    """
+    Process exams that closed since the stored watermark (or every closed
+    exam when full=True), then advance the watermark.
+
+    Returns a per-exam report.
+    """
+    now = timezone.now()
+    # Grade attempts that ran out of time first, so they aren't marked absent
+    process_due_attempts(now)
+
+    # An exam is only closed out once its last attempt is past SUBMIT_GRACE,
+    # so a submit still in flight at end_time isn't overtaken
+    cutoff = now - SUBMIT_GRACE
+    exams = Exam.objects.filter(end_time__lt=cutoff).order_by('end_time')
+
+    state = JobWatermark.objects.filter(name=ABSENCE_JOB).first()
+    if state and not full:
+        exams = exams.filter(end_time__gte=state.watermark)
+
+    report = []
+    for exam in exams:
+        started = time.perf_counter()
+        created, closed = mark_exam_absentees(exam)
+        report.append({
+            'exam_id': exam.id,
+            'title': exam.title,
+            'created': created,
+            'closed': closed,
+            'seconds': round(time.perf_counter() - started, 4),
+        })
+
+    JobWatermark.objects.update_or_create(name=ABSENCE_JOB, defaults={'watermark': cutoff})
+    return report
@@ -1,8 +1,9 @@
 from django.contrib import admin
-from .models import Exam, Question, ExamAttempt, Answer
+from .models import Exam, Question, ExamAttempt, Answer, JobWatermark
 
 # Register your models
 admin.site.register(Exam)
 admin.site.register(Question)
 admin.site.register(ExamAttempt)
-admin.site.register(Answer)
\ No newline at end of file
+admin.site.register(Answer)
+admin.site.register(JobWatermark)
\ No newline at end of file
@@ -6,8 +6,11 @@ from .admin_views import (
     admin_delete_exam,
     admin_question_list,
     admin_create_question,
+    admin_import_questions,
+    admin_export_questions,
     admin_update_question,
-    admin_delete_question
+    admin_delete_question,
+    admin_cache_stats,
 )
 
 urlpatterns = [
@@ -17,6 +20,9 @@ urlpatterns = [
     path('exams/<int:exam_id>/delete/', admin_delete_exam, name='admin_delete_exam'),
     path('exams/<int:exam_id>/questions/', admin_question_list, name='admin_question_list'),
     path('exams/<int:exam_id>/questions/create/', admin_create_question, name='admin_create_question'),
+    path('exams/<int:exam_id>/questions/import/', admin_import_questions, name='admin_import_questions'),
+    path('exams/<int:exam_id>/questions/export/', admin_export_questions, name='admin_export_questions'),
     path('questions/<int:question_id>/update/', admin_update_question, name='admin_update_question'),
     path('questions/<int:question_id>/delete/', admin_delete_question, name='admin_delete_question'),
+    path('cache/stats/', admin_cache_stats, name='admin_cache_stats'),
 ]
\ No newline at end of file
@@ -1,26 +1,70 @@
-# exams/admin_views.py - WITH DEBUG PRINTS
+# exams/admin_views.py
+import logging
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from .models import Exam, Question
+from backend.cache import cached, stats as cache_stats
+from backend.db_routers import current_read_alias, reporting_view
+from backend.pagination import CursorError, RowFileError, keyset_page, page_size_from
+from .catalogue import (
+    CATALOGUE_ORDERING, EXAM_STATUSES, catalogue_cache_key, catalogue_filters, filter_catalogue
+)
+from .models import Exam, Question, parse_flag
+from .question_io import (
+    EXPORT_FORMATS, detect_format, export_questions, import_questions, iter_rows
+)
 from .serializers import ExamSerializer, QuestionSerializer
 
 
+logger = logging.getLogger(__name__)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@reporting_view
 def admin_exam_list(request):
-    print("=" * 50)
-    print("ADMIN_EXAM_LIST called")
-    print("=" * 50)
-    
-    exams = Exam.objects.all()
-    print(f"Found {exams.count()} exams")
+    """
+    One page of exams, newest first. Filters: department, batch,
+    status (upcoming/active/expired) and created_by (a username).
+    Pass the returned next cursor as ?cursor= for the following page.
+    """
+    filters = catalogue_filters(request.query_params)
+    if filters['status'] and filters['status'] not in EXAM_STATUSES:
+        return Response({"error": f"status must be one of {', '.join(EXAM_STATUSES)}"}, status=400)
+
+    cursor = request.query_params.get('cursor') or None
+    try:
+        page_size = page_size_from(request.query_params)
+        build = lambda: build_admin_exam_list(filters, cursor, page_size)
+        if filters['status']:
+            # Which exams match moves with the clock, so don't cache these
+            page = build()
+        else:
+            page = cached(
+                'admin_exam_list', (catalogue_cache_key(filters, cursor, page_size),),
+                ('exam', 'question', 'user', 'userprofile'), build
+            )
+    except CursorError as e:
+        return Response({"error": str(e)}, status=400)
+
+    return Response(page)
+
+
+def build_admin_exam_list(filters, cursor, page_size):
+    exams, next_cursor = keyset_page(
+        filter_catalogue(Exam.objects.select_related('created_by__user'), filters),
+        CATALOGUE_ORDERING,
+        cursor,
+        page_size,
+    )
     
     exam_data = []
     for exam in exams:
-        question_count = Question.objects.filter(exam=exam).count()
+        question_count = exam.question_count
         exam_data.append({
             'id': exam.id,
             'title': exam.title,
@@ -28,23 +72,19 @@ def admin_exam_list(request):
             'total_marks': question_count,
             'department': exam.department,
             'allowed_batch': exam.allowed_batch,
+            'shuffle_questions': exam.shuffle_questions,
             'question_count': question_count,
             'start_time': exam.start_time,
             'end_time': exam.end_time,
             'created_by': exam.created_by.user.username if exam.created_by else 'Admin',
         })
     
-    return Response(exam_data)
+    return {"results": exam_data, "next": next_cursor, "page_size": page_size}
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def admin_create_exam(request):
-    print("=" * 50)
-    print("ADMIN_CREATE_EXAM called")
-    print("Request data:", request.data)
-    print("=" * 50)
-    
     title = request.data.get('title')
     duration = request.data.get('duration')
     department = request.data.get('department')
@@ -52,19 +92,15 @@ def admin_create_exam(request):
     start_time = request.data.get('start_time')
     end_time = request.data.get('end_time')
     
-    print(f"Parsed data: title={title}, duration={duration}, department={department}")
-    print(f"Times: start={start_time}, end={end_time}")
-    
     if not all([title, duration, department]):
-        error_msg = "title, duration, and department are required"
-        print(f"ERROR: {error_msg}")
-        return Response({"error": error_msg}, status=400)
+        return Response({"error": "title, duration, and department are required"}, status=400)
     
     exam_data = {
         'title': title,
         'duration': duration,
         'department': department,
         'allowed_batch': allowed_batch,
+        'shuffle_questions': parse_flag(request.data.get('shuffle_questions', False)),
         'created_by': None,
     }
     
@@ -73,54 +109,35 @@ def admin_create_exam(request):
             start_dt = timezone.datetime.fromisoformat(start_time.replace('Z', '+00:00'))
             end_dt = timezone.datetime.fromisoformat(end_time.replace('Z', '+00:00'))
             
-            print(f"Parsed times: start={start_dt}, end={end_dt}")
-            
             if end_dt <= start_dt:
-                error_msg = "end_time must be after start_time"
-                print(f"ERROR: {error_msg}")
-                return Response({"error": error_msg}, status=400)
+                return Response({"error": "end_time must be after start_time"}, status=400)
             
             exam_data['start_time'] = start_dt
             exam_data['end_time'] = end_dt
         except ValueError as e:
-            error_msg = f"Invalid datetime format: {str(e)}"
-            print(f"ERROR: {error_msg}")
-            return Response({"error": error_msg}, status=400)
+            return Response({"error": f"Invalid datetime format: {str(e)}"}, status=400)
     else:
         exam_data['start_time'] = timezone.now()
         exam_data['end_time'] = timezone.now() + timezone.timedelta(days=7)
-        print("Using default times (now to +7 days)")
-    
-    print(f"Creating exam with data: {exam_data}")
     
     try:
         exam = Exam.objects.create(**exam_data)
-        print(f"SUCCESS! Created exam with ID: {exam.id}")
+        logger.info("Admin created exam %s", exam.id, extra={'exam_id': exam.id})
         return Response({
             "message": "Exam created successfully",
             "exam_id": exam.id
         }, status=201)
     except Exception as e:
-        error_msg = f"Failed to create exam: {str(e)}"
-        print(f"ERROR: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        return Response({"error": error_msg}, status=500)
+        logger.exception("Failed to create exam")
+        return Response({"error": f"Failed to create exam: {str(e)}"}, status=500)
 
 
 @api_view(['PUT'])
 @permission_classes([AllowAny])
 def admin_update_exam(request, exam_id):
-    print("=" * 50)
-    print(f"ADMIN_UPDATE_EXAM called for exam_id={exam_id}")
-    print("Request data:", request.data)
-    print("=" * 50)
-    
     try:
         exam = Exam.objects.get(id=exam_id)
-        print(f"Found exam: {exam.title}")
     except Exam.DoesNotExist:
-        print(f"ERROR: Exam {exam_id} not found")
         return Response({"error": "Exam not found"}, status=404)
     
     if 'title' in request.data:
@@ -131,6 +148,8 @@ def admin_update_exam(request, exam_id):
         exam.department = request.data['department']
     if 'allowed_batch' in request.data:
         exam.allowed_batch = request.data['allowed_batch']
+    if 'shuffle_questions' in request.data:
+        exam.shuffle_questions = parse_flag(request.data['shuffle_questions'])
     
     if 'start_time' in request.data:
         try:
@@ -138,9 +157,7 @@ def admin_update_exam(request, exam_id):
                 request.data['start_time'].replace('Z', '+00:00')
             )
         except ValueError as e:
-            error_msg = f"Invalid start_time format: {str(e)}"
-            print(f"ERROR: {error_msg}")
-            return Response({"error": error_msg}, status=400)
+            return Response({"error": f"Invalid start_time format: {str(e)}"}, status=400)
     
     if 'end_time' in request.data:
         try:
@@ -148,49 +165,44 @@ def admin_update_exam(request, exam_id):
                 request.data['end_time'].replace('Z', '+00:00')
             )
         except ValueError as e:
-            error_msg = f"Invalid end_time format: {str(e)}"
-            print(f"ERROR: {error_msg}")
-            return Response({"error": error_msg}, status=400)
+            return Response({"error": f"Invalid end_time format: {str(e)}"}, status=400)
     
     if exam.start_time and exam.end_time:
         if exam.end_time <= exam.start_time:
-            print("ERROR: end_time must be after start_time")
             return Response({"error": "end_time must be after start_time"}, status=400)
     
     try:
         exam.save()
-        print(f"SUCCESS! Updated exam {exam_id}")
+        logger.info("Admin updated exam %s", exam_id, extra={'exam_id': exam_id})
         return Response({"message": "Exam updated successfully"})
     except Exception as e:
-        error_msg = f"Failed to update exam: {str(e)}"
-        print(f"ERROR: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        return Response({"error": error_msg}, status=500)
+        logger.exception("Failed to update exam %s", exam_id, extra={'exam_id': exam_id})
+        return Response({"error": f"Failed to update exam: {str(e)}"}, status=500)
 
 
 @api_view(['DELETE'])
 @permission_classes([AllowAny])
 def admin_delete_exam(request, exam_id):
-    print("=" * 50)
-    print(f"ADMIN_DELETE_EXAM called for exam_id={exam_id}")
-    print("=" * 50)
-    
     try:
         exam = Exam.objects.get(id=exam_id)
-        print(f"Found exam: {exam.title}")
         exam.delete()
-        print(f"SUCCESS! Deleted exam {exam_id}")
+        logger.info("Admin deleted exam %s", exam_id, extra={'exam_id': exam_id})
         return Response({"message": "Exam deleted successfully"})
     except Exam.DoesNotExist:
-        print(f"ERROR: Exam {exam_id} not found")
         return Response({"error": "Exam not found"}, status=404)
     except Exception as e:
-        error_msg = f"Failed to delete exam: {str(e)}"
-        print(f"ERROR: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        return Response({"error": error_msg}, status=500)
+        logger.exception("Failed to delete exam %s", exam_id, extra={'exam_id': exam_id})
+        return Response({"error": f"Failed to delete exam: {str(e)}"}, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def admin_cache_stats(request):
+    """Cache hit/miss counts for this worker process"""
+    return Response({
+        'backend': settings.CACHES['default']['BACKEND'],
+        'namespaces': cache_stats(),
+    })
 
 
 # Question views remain the same...
@@ -238,9 +250,78 @@ def admin_create_question(request, exam_id):
             "question_id": question.id
         }, status=201)
     except Exception as e:
+        logger.exception("Failed to create question")
         return Response({"error": f"Failed to create question: {str(e)}"}, status=500)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def admin_import_questions(request, exam_id):
+    """
+    Bulk-create questions from an uploaded CSV, TSV, JSON Lines or .xlsx
+    file ('file'; file_format overrides the extension). With skip_invalid,
+    valid rows are kept even if others fail; dry_run only validates.
+    """
+    try:
+        exam = Exam.objects.get(id=exam_id)
+    except Exam.DoesNotExist:
+        return Response({"error": "Exam not found"}, status=404)
+
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "file required"}, status=400)
+
+    try:
+        fmt = detect_format(upload.name, request.data.get('file_format'))
+        report = import_questions(
+            exam,
+            iter_rows(upload.file, fmt),
+            skip_invalid=parse_flag(request.data.get('skip_invalid')),
+            dry_run=parse_flag(request.data.get('dry_run')),
+        )
+    except RowFileError as e:
+        return Response({"error": str(e)}, status=400)
+
+    logger.info(
+        "Question import into exam %s: %d imported, %d invalid", exam.id, report['imported'], report['error_count'],
+        extra={'exam_id': exam.id, 'imported': report['imported'], 'invalid': report['error_count'], 'dry_run': report['dry_run']}
+    )
+
+    if report['error_count'] and not report['imported']:
+        return Response({"error": "No questions imported", **report}, status=400)
+
+    return Response({
+        "message": f"Imported {report['imported']} questions",
+        **report
+    }, status=200 if report['dry_run'] else 201)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@reporting_view
+def admin_export_questions(request, exam_id):
+    """Stream an exam's questions, with answers, as CSV (default), TSV or JSON Lines"""
+    # ?format= is taken by DRF's content negotiation
+    fmt = request.query_params.get('file_format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return Response({"error": f"file_format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+
+    if not Exam.objects.filter(id=exam_id).exists():
+        return Response({"error": "Exam not found"}, status=404)
+
+    content_types = {
+        'csv': 'text/csv',
+        'tsv': 'text/tab-separated-values',
+        'jsonl': 'application/x-ndjson',
+    }
+    # The stream is read after reporting_view has returned, so pin the replica now
+    response = StreamingHttpResponse(
+        export_questions(exam_id, fmt, using=current_read_alias()), content_type=content_types[fmt]
+    )
+    response['Content-Disposition'] = f'attachment; filename="exam-{exam_id}-questions.{fmt}"'
+    return response
+
+
 @api_view(['PUT'])
 @permission_classes([AllowAny])
 def admin_update_question(request, question_id):
@@ -268,6 +349,7 @@ def admin_update_question(request, question_id):
         question.save()
         return Response({"message": "Question updated successfully"})
     except Exception as e:
+        logger.exception("Failed to update question")
         return Response({"error": f"Failed to update question: {str(e)}"}, status=500)
 
 
@@ -281,4 +363,5 @@ def admin_delete_question(request, question_id):
     except Question.DoesNotExist:
         return Response({"error": "Question not found"}, status=404)
     except Exception as e:
+        logger.exception("Failed to delete question")
         return Response({"error": f"Failed to delete question: {str(e)}"}, status=500)
\ No newline at end of file
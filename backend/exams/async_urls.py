@@ -0,0 +1,8 @@
+from django.urls import path
+from .async_views import exam_questions, start_exam, submit_exam
+
+urlpatterns = [
+    path('<int:exam_id>/questions/', exam_questions),
+    path('<int:exam_id>/start/', start_exam),
+    path('<int:exam_id>/submit/', submit_exam),
+]
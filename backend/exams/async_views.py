@@ -0,0 +1,115 @@
+# exams/async_views.py
+"""
+Async versions of the exam-taking endpoints, mounted under /api/async/exams/.
+
+They return the same payloads as their counterparts in exams.views, but
+run on the event loop under ASGI instead of holding a worker thread for
+the whole request. The checks and payloads are shared with the sync views
+(exams.eligibility, exams.submission); work that has no async API (cache
+builds, transactions) is handed to sync_to_async.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from users.models import UserProfile
+from .eligibility import exam_access_error
+from .models import Exam, ExamAttempt
+from .papers import get_paper, paper_response
+from .scheduler import attempt_deadline
+from .submission import started_exam_data, submit_answers
+
+
+def request_json(request):
+    """Decode a JSON request body, None if it isn't a JSON object"""
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@require_GET
+async def exam_questions(request, exam_id):
+    user_id = request.GET.get("user_id")
+    if not user_id:
+        return JsonResponse({"error": "user_id required"}, status=400)
+
+    try:
+        user_id = int(user_id)
+    except ValueError:
+        return JsonResponse({"error": "Invalid user_id"}, status=400)
+
+    try:
+        user = await UserProfile.objects.aget(user_id=user_id)
+    except UserProfile.DoesNotExist:
+        return JsonResponse({"error": "UserProfile not found"}, status=404)
+
+    try:
+        exam = await Exam.objects.aget(id=exam_id)
+    except Exam.DoesNotExist:
+        return JsonResponse({"error": "Exam not found"}, status=404)
+
+    denied = exam_access_error(user, exam)
+    if denied:
+        return JsonResponse({"error": denied}, status=403)
+
+    paper = await sync_to_async(get_paper)(exam)
+    return paper_response(request, paper, exam, user)
+
+
+@csrf_exempt
+@require_POST
+async def start_exam(request, exam_id):
+    data = request_json(request)
+    if data is None:
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+
+    user_id = data.get("user_id")
+    if not user_id:
+        return JsonResponse({"error": "user_id required"}, status=400)
+
+    try:
+        profile = await UserProfile.objects.aget(user_id=user_id)
+        exam = await Exam.objects.aget(id=exam_id)
+    except (UserProfile.DoesNotExist, Exam.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Invalid user or exam"}, status=404)
+
+    denied = exam_access_error(profile, exam)
+    if denied:
+        return JsonResponse({"error": denied}, status=403)
+
+    attempt, created = await ExamAttempt.objects.aget_or_create(
+        student=profile, exam=exam, defaults={'deadline': attempt_deadline(exam, timezone.now())}
+    )
+
+    if attempt.is_submitted:
+        return JsonResponse({"error": "Exam already submitted"}, status=400)
+
+    return JsonResponse(started_exam_data(attempt, exam))
+
+
+@csrf_exempt
+@require_POST
+async def submit_exam(request, exam_id):
+    data = request_json(request)
+    if data is None:
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+
+    user_id = data.get("user_id")
+    if not user_id:
+        return JsonResponse({"error": "user_id required"}, status=400)
+
+    try:
+        attempt = await ExamAttempt.objects.select_related('exam').aget(
+            student__user_id=user_id, exam_id=exam_id
+        )
+    except (ExamAttempt.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Exam attempt not found"}, status=404)
+
+    data, status = await sync_to_async(submit_answers)(attempt, data.get('answers', []))
+    return JsonResponse(data, status=status)
@@ -0,0 +1,70 @@
+# exams/catalogue.py
+"""
+Filters and ordering shared by the admin and teacher exam catalogues.
+
+Both are keyset-paginated newest first (backend.pagination). A teacher's
+pages are read straight off exam_creator_catalogue_idx; the admin list
+covers every exam, which is few enough rows to sort per page.
+"""
+from urllib.parse import urlencode
+
+from django.utils import timezone
+
+from backend.cache import bump_version
+
+
+CATALOGUE_ORDERING = ['-start_time', '-id']
+
+EXAM_STATUSES = ('upcoming', 'active', 'expired')
+
+FILTER_PARAMS = ('department', 'batch', 'status', 'created_by')
+
+
+def attempts_entity(creator_id):
+    """
+    Cache version entity for the submitted attempts at one teacher's exams.
+    Kept per teacher so a submit only invalidates its own teacher's pages.
+    """
+    return f'attempt:{creator_id}'
+
+
+def bump_attempt_versions(*creator_ids):
+    """Invalidate the catalogues of the teachers who created these exams"""
+    entities = [attempts_entity(creator_id) for creator_id in set(creator_ids) if creator_id is not None]
+    if entities:
+        bump_version(*entities)
+
+
+def catalogue_filters(params):
+    """The catalogue filters from query params, '' for any not given"""
+    return {name: params.get(name, '').strip() for name in FILTER_PARAMS}
+
+
+def filter_catalogue(exams, filters, now=None):
+    if filters['department']:
+        exams = exams.filter(department=filters['department'])
+    if filters['batch']:
+        exams = exams.filter(allowed_batch=filters['batch'])
+    if filters['created_by']:
+        exams = exams.filter(created_by__user__username=filters['created_by'])
+
+    now = now or timezone.now()
+    if filters['status'] == 'upcoming':
+        exams = exams.filter(start_time__gt=now)
+    elif filters['status'] == 'active':
+        exams = exams.filter(start_time__lte=now, end_time__gte=now)
+    elif filters['status'] == 'expired':
+        exams = exams.filter(end_time__lt=now)
+    return exams
+
+
+def catalogue_cache_key(filters, cursor, page_size):
+    return urlencode(sorted({**filters, 'cursor': cursor or '', 'page_size': page_size}.items()))
+
+
+def status_flags(exam, now):
+    return {
+        'is_active': exam['start_time'] <= now <= exam['end_time'],
+        'is_upcoming': now < exam['start_time'],
+        'is_expired': now > exam['end_time'],
+    }
@@ -0,0 +1,71 @@
+# exams/eligibility.py
+from django.db.models import Q
+from django.utils import timezone
+
+from backend.cache import cached
+from .models import Exam, ExamAttempt
+
+
+# Entries also age out so exams that have ended drop off the index
+VISIBLE_EXAMS_TIMEOUT = 60 * 5
+
+VISIBLE_EXAM_FIELDS = (
+    'id', 'title', 'duration', 'department', 'allowed_batch',
+    'question_count', 'start_time', 'end_time',
+)
+
+
+def visible_exams(department, batch):
+    """
+    Exams a (department, batch) group can see that have not ended yet,
+    newest first, as a list of dicts with VISIBLE_EXAM_FIELDS.
+
+    The list is shared by every student in the group; callers filter it
+    by the current time window and by the student's own submissions.
+    """
+    return cached(
+        'visible_exams', (department, batch), ('exam', 'question'),
+        lambda: list(visible_exams_query(department, batch)),
+        timeout=VISIBLE_EXAMS_TIMEOUT
+    )
+
+
+def visible_exams_query(department, batch):
+    """The query visible_exams() caches"""
+    return Exam.objects.filter(
+        department=department
+    ).filter(
+        Q(allowed_batch='') | Q(allowed_batch=batch)
+    ).filter(
+        end_time__gte=timezone.now()
+    ).values(*VISIBLE_EXAM_FIELDS)
+
+
+def submitted_exam_ids(student, exam_ids):
+    """Query for the ids among exam_ids that the student has submitted"""
+    # Unordered: the ids go into a set, and the default ordering costs a sort
+    return ExamAttempt.objects.filter(
+        student=student,
+        is_submitted=True,
+        exam_id__in=exam_ids
+    ).order_by().values_list('exam_id', flat=True)
+
+
+def exam_access_error(profile, exam, now=None):
+    """
+    Why a student may not take an exam right now, None if they may.
+    Every reason is answered with a 403.
+    """
+    if exam.department != profile.department:
+        return "Not allowed"
+
+    if exam.allowed_batch and exam.allowed_batch != profile.batch:
+        return "Not allowed"
+
+    now = now or timezone.now()
+    if now < exam.start_time:
+        return "Exam has not started yet"
+    if now > exam.end_time:
+        return "Exam has ended"
+
+    return None
@@ -0,0 +1,244 @@
+# exams/grading.py
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from backend.cache import cached
+from . import packing
+from .models import Question, Answer, ExamAttempt, allocate_answer_slots
+from .shuffling import OPTION_LETTERS
+
+
+# Answer keys are immutable per (exam, content_version), so a long timeout is safe
+ANSWER_KEY_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+class GradingError(ValueError):
+    """Raised when a submission cannot be graded against the exam's answer key"""
+
+
+class AnswerKey:
+    """
+    Compact answer key: sorted question ids with one option byte and one
+    answer slot per question (-1 for none), plus, with packed=True, the
+    whole key in packed form.
+
+    Behaves like a read-only mapping of question id -> correct option.
+    """
+    __slots__ = ('question_ids', 'options', 'slots', 'packed')
+
+    def __init__(self, rows, packed=False):
+        rows = sorted(rows)
+        self.question_ids = array('q', [question_id for question_id, _, _ in rows])
+        self.options = ''.join(option for _, option, _ in rows).encode('ascii')
+        self.slots = array('q', [-1 if slot is None else slot for _, _, slot in rows])
+        self.packed = None
+        if packed:
+            self.packed = packing.to_int(packing.encode({slot: option for _, option, slot in rows}))
+
+    def _index(self, question_id):
+        i = bisect_left(self.question_ids, question_id)
+        if i < len(self.question_ids) and self.question_ids[i] == question_id:
+            return i
+        return -1
+
+    def __contains__(self, question_id):
+        return self._index(question_id) >= 0
+
+    def __getitem__(self, question_id):
+        i = self._index(question_id)
+        if i < 0:
+            raise KeyError(question_id)
+        return chr(self.options[i])
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def slot(self, question_id):
+        return self.slots[self._index(question_id)]
+
+
+def load_answer_key(exam_id):
+    """Build the answer key for an exam from the database, in a single query"""
+    questions = Question.objects.filter(exam_id=exam_id).values_list('id', 'correct_option', 'slot')
+    if settings.ANSWER_STORAGE != 'packed':
+        return AnswerKey(questions)
+
+    rows = list(questions)
+    if any(slot is None for _, _, slot in rows):
+        assign_missing_slots(exam_id, [question_id for question_id, _, slot in rows if slot is None])
+        rows = list(questions.all())
+    return AnswerKey(rows, packed=True)
+
+
+def assign_missing_slots(exam_id, question_ids):
+    """Give questions inserted without the pre_save signal (e.g. by bulk_create) an answer slot"""
+    for question_id, slot in zip(question_ids, allocate_answer_slots(exam_id, len(question_ids))):
+        # A concurrent load may have got there first; its slot stands
+        Question.objects.filter(id=question_id, slot__isnull=True).update(slot=slot)
+
+
+def get_answer_key(exam):
+    """Return the exam's answer key, from cache when the content version matches"""
+    # Only keys built for packed storage carry the packed form
+    return cached(
+        'answer_key', (exam.id, exam.content_version, settings.ANSWER_STORAGE), (),
+        lambda: load_answer_key(exam.id),
+        timeout=ANSWER_KEY_CACHE_TIMEOUT
+    )
+
+
+def parse_answers(answer_key, answers, unshuffle=None):
+    """
+    Validate submitted answers against the answer key.
+
+    Returns selections mapping question id to the selected option. A
+    question answered twice keeps its last answer. For shuffled exams,
+    unshuffle(question_id, option) maps the letter the student saw back to
+    the base paper's letter.
+    """
+    selections = {}
+    unknown = []
+
+    for item in answers:
+        try:
+            question_id = int(item['question_id'])
+            selected_option = item['selected_option']
+        except (KeyError, TypeError, ValueError):
+            raise GradingError("Each answer needs a numeric question_id and a selected_option")
+
+        if question_id not in answer_key:
+            unknown.append(question_id)
+            continue
+
+        if selected_option not in OPTION_LETTERS:
+            raise GradingError(f"selected_option must be one of {', '.join(OPTION_LETTERS)}")
+
+        if unshuffle is not None:
+            selected_option = unshuffle(question_id, selected_option)
+
+        selections[question_id] = selected_option
+
+    if unknown:
+        raise GradingError(f"Unknown question ids for this exam: {sorted(set(unknown))}")
+
+    return selections
+
+
+def score_answers(answer_key, selections):
+    """Count the selections that match the answer key"""
+    return sum(
+        1 for question_id, option in selections.items()
+        if question_id in answer_key and option == answer_key[question_id]
+    )
+
+
+def save_answers(attempt_id, answer_key, selections):
+    """
+    Store changed answers in the configured ANSWER_STORAGE. Call it in a
+    transaction that already holds the attempt's row.
+    """
+    if not selections:
+        return
+
+    if settings.ANSWER_STORAGE == 'packed':
+        current = ExamAttempt.objects.values_list('packed_answers', flat=True).get(id=attempt_id)
+        changes = {answer_key.slot(question_id): option for question_id, option in selections.items()}
+        ExamAttempt.objects.filter(id=attempt_id).update(
+            packed_answers=packing.merge(current, changes)
+        )
+    else:
+        upsert_answers(attempt_id, selections)
+
+
+def upsert_answers(attempt_id, selections):
+    """Insert or overwrite the attempt's answers for these questions in one statement"""
+    Answer.objects.bulk_create(
+        [
+            Answer(attempt_id=attempt_id, question_id=question_id, selected_option=option)
+            for question_id, option in selections.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['attempt', 'question'],
+        update_fields=['selected_option'],
+    )
+
+
+def load_saved_answers(attempt_ids):
+    """Saved selections per attempt id, in a single query"""
+    saved = defaultdict(dict)
+    for attempt_id, question_id, option in Answer.objects.filter(
+        attempt_id__in=attempt_ids
+    ).values_list('attempt_id', 'question_id', 'selected_option'):
+        saved[attempt_id][question_id] = option
+    return saved
+
+
+def saved_scores(attempts):
+    """
+    Grade what is saved for each attempt (with its exam loaded).
+    Returns {attempt id: score}.
+    """
+    answer_keys = {}
+    for attempt in attempts:
+        if attempt.exam_id not in answer_keys:
+            answer_keys[attempt.exam_id] = get_answer_key(attempt.exam)
+
+    attempt_ids = [attempt.id for attempt in attempts]
+
+    if settings.ANSWER_STORAGE == 'packed':
+        packed = dict(ExamAttempt.objects.filter(id__in=attempt_ids).values_list('id', 'packed_answers'))
+        return {
+            attempt.id: packing.count_matches(packed[attempt.id], answer_keys[attempt.exam_id].packed)
+            for attempt in attempts
+        }
+
+    saved = load_saved_answers(attempt_ids)
+    return {
+        attempt.id: score_answers(answer_keys[attempt.exam_id], saved[attempt.id])
+        for attempt in attempts
+    }
+
+
+def apply_autosave(attempt_id, answer_key, seq, selections):
+    """
+    Save an autosave's changed answers unless a newer autosave, or the
+    submit, got there first. Returns whether it was applied.
+    """
+    with transaction.atomic():
+        if not ExamAttempt.objects.filter(
+            id=attempt_id, is_submitted=False, autosave_seq__lt=seq
+        ).update(autosave_seq=seq):
+            return False
+
+        save_answers(attempt_id, answer_key, selections)
+    return True
+
+
+def submit_attempt(attempt, answer_key, selections):
+    """
+    Save the final changed answers, grade everything saved for the attempt
+    and mark it submitted. Returns the score, or None if the attempt was
+    submitted concurrently.
+    """
+    with transaction.atomic():
+        # Waits for an in-flight autosave, and stops a double submit
+        if not ExamAttempt.objects.select_for_update().filter(
+            id=attempt.id, is_submitted=False
+        ).exists():
+            return None
+
+        save_answers(attempt.id, answer_key, selections)
+
+        attempt.score = saved_scores([attempt])[attempt.id]
+        attempt.is_submitted = True
+        attempt.status = 'submitted'
+        attempt.end_time = timezone.now()
+        # packed_answers on this instance predates the save above
+        attempt.save(update_fields=['score', 'is_submitted', 'status', 'end_time'])
+
+    return attempt.score
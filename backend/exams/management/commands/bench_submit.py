@@ -0,0 +1,162 @@
+import logging
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.utils import timezone
+
+from exams.models import Exam, ExamAttempt, Question, allocate_answer_slots, record_question_change
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure submit_exam throughput against the configured database. "
+        "Run it once per profile (e.g. EXAMPRO_SQLITE_WAL=0, the default WAL "
+        "profile, EXAMPRO_DB_ENGINE=postgres) on a scratch database to compare them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help="Number of concurrent attempts to submit")
+        parser.add_argument('--questions', type=int, default=40, help="Questions per exam")
+        parser.add_argument('--threads', type=int, default=8, help="Submitting worker threads")
+        parser.add_argument('--keep', action='store_true', help="Leave the seeded exam and students in place")
+
+    def handle(self, *args, **options):
+        # Per-request logs (access lines, submits, 500 tracebacks) would bury
+        # the report, which counts failed submits itself
+        logging.disable(logging.ERROR)
+
+        tag = uuid.uuid4().hex[:8]
+        exam, user_ids = self.seed(tag, options['students'], options['questions'])
+        question_ids = list(Question.objects.filter(exam=exam).values_list('id', flat=True))
+
+        self.stdout.write(f"Database: {self.describe_database()}")
+        self.stdout.write(
+            f"Submitting {len(user_ids)} attempts of {len(question_ids)} questions "
+            f"from {options['threads']} threads"
+        )
+
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+        chunks = [user_ids[i::options['threads']] for i in range(options['threads'])]
+
+        def worker(chunk):
+            # Server errors (e.g. "database is locked") come back as 500s to count
+            client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+            rng = random.Random()
+            try:
+                for user_id in chunk:
+                    answers = [
+                        {"question_id": question_id, "selected_option": rng.choice('ABCD')}
+                        for question_id in question_ids
+                    ]
+                    started = time.perf_counter()
+                    try:
+                        response = client.post(
+                            f'/api/exams/{exam.id}/submit/',
+                            {"user_id": user_id, "answers": answers},
+                            content_type='application/json',
+                        )
+                        outcome = response.status_code
+                    except Exception as e:
+                        # e.g. a lock error raised outside the view
+                        outcome = type(e).__name__
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        if outcome == 200:
+                            latencies.append(elapsed)
+                        else:
+                            failures.append(outcome)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(chunk,)) for chunk in chunks]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall = time.perf_counter() - started
+
+        if not options['keep']:
+            self.cleanup(exam, user_ids)
+
+        if latencies:
+            latencies.sort()
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f"Latency: p50 {statistics.median(latencies) * 1000:.1f}ms, "
+                f"p95 {p95 * 1000:.1f}ms, max {latencies[-1] * 1000:.1f}ms"
+            )
+        if failures:
+            breakdown = ', '.join(f"{outcome}: {count}" for outcome, count in Counter(failures).most_common())
+            self.stdout.write(self.style.WARNING(f"{len(failures)} submit(s) failed ({breakdown})"))
+        self.stdout.write((self.style.WARNING if failures else self.style.SUCCESS)(
+            f"{len(latencies)} submits, {len(failures)} failed, in {wall:.2f}s ({len(latencies) / wall:.1f}/s)"
+        ))
+
+    def seed(self, tag, students, questions):
+        now = timezone.now()
+        exam = Exam.objects.create(
+            title=f"bench-{tag}",
+            duration=60,
+            department=f"bench-{tag}",
+            start_time=now - timedelta(minutes=5),
+            end_time=now + timedelta(hours=1),
+        )
+        Question.objects.bulk_create([
+            Question(
+                exam=exam,
+                question_text=f"Question {i}",
+                option_a='a', option_b='b', option_c='c', option_d='d',
+                correct_option=random.choice('ABCD'),
+                slot=slot,
+            )
+            # bulk_create() skips the pre_save signal that assigns slots
+            for i, slot in enumerate(allocate_answer_slots(exam.id, questions))
+        ])
+        record_question_change(exam.id, questions)
+        exam.refresh_from_db()
+
+        User.objects.bulk_create([
+            User(username=f"bench-{tag}-{i}", password='!') for i in range(students)
+        ])
+        users = list(User.objects.filter(username__startswith=f"bench-{tag}-"))
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, role='student', department=exam.department) for user in users
+        ])
+        ExamAttempt.objects.bulk_create([
+            ExamAttempt(student=profile, exam=exam)
+            for profile in UserProfile.objects.filter(user__in=users)
+        ])
+        return exam, [user.id for user in users]
+
+    def cleanup(self, exam, user_ids):
+        exam.delete()
+        User.objects.filter(id__in=user_ids).delete()
+
+    def describe_database(self):
+        if connection.vendor != 'sqlite':
+            settings = connection.settings_dict
+            pooled = bool(settings['OPTIONS'].get('pool'))
+            return f"{connection.vendor}, CONN_MAX_AGE={settings['CONN_MAX_AGE']}, pool={pooled}"
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+            cursor.execute('PRAGMA synchronous')
+            synchronous = cursor.fetchone()[0]
+        return (
+            f"sqlite, journal_mode={journal_mode}, synchronous={synchronous}, "
+            f"transaction_mode={connection.transaction_mode or 'DEFERRED'}"
+        )
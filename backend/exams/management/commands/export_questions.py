@@ -0,0 +1,27 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from exams.models import Exam
+from exams.question_io import EXPORT_FORMATS, export_questions
+
+
+class Command(BaseCommand):
+    help = "Stream an exam's questions, with answers, as CSV, TSV or JSON Lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int)
+        parser.add_argument('--format', dest='file_format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', '-o', help="File to write (default: stdout)")
+
+    def handle(self, *args, **options):
+        if not Exam.objects.filter(id=options['exam_id']).exists():
+            raise CommandError(f"Exam {options['exam_id']} not found")
+
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in export_questions(options['exam_id'], options['file_format']):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.pagination import RowFileError
+from exams.models import Exam
+from exams.question_io import detect_format, import_questions, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk-import questions into an exam from a CSV, TSV, JSON Lines or .xlsx file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('exam_id', type=int)
+        parser.add_argument('path', help="File to import")
+        parser.add_argument('--format', dest='file_format', help="csv, tsv, jsonl or xlsx (default: from the extension)")
+        parser.add_argument('--skip-invalid', action='store_true', help="Import the valid rows even if some fail")
+        parser.add_argument('--dry-run', action='store_true', help="Validate without importing")
+
+    def handle(self, *args, **options):
+        try:
+            exam = Exam.objects.get(id=options['exam_id'])
+        except Exam.DoesNotExist:
+            raise CommandError(f"Exam {options['exam_id']} not found")
+
+        try:
+            fmt = detect_format(options['path'], options['file_format'])
+            with open(options['path'], 'rb') as stream:
+                report = import_questions(
+                    exam,
+                    iter_rows(stream, fmt),
+                    skip_invalid=options['skip_invalid'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, RowFileError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {'; '.join(error['errors'])}")
+        if report['error_count'] > len(report['errors']):
+            self.stderr.write(f"... and {report['error_count'] - len(report['errors'])} more invalid row(s)")
+
+        if report['error_count'] and not report['imported']:
+            raise CommandError(f"No questions imported: {report['error_count']} invalid row(s)")
+
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {report['imported']} question(s) into exam {exam.id}"))
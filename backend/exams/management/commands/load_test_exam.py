@@ -0,0 +1,223 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from exams.models import Exam, Question, allocate_answer_slots, record_question_change
+from users.models import UserProfile
+
+
+PATH_PREFIXES = {
+    'sync': '/api',
+    'async': '/api/async',
+}
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client, one per simulated candidate"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"\r\n"
+        )
+        self.writer.write(head.encode() + payload)
+        await self.writer.drain()
+        return await asyncio.wait_for(self.read_response(), self.timeout)
+
+    async def read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).strip(), 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if not size:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate concurrent candidates (start, fetch paper, poll violations, "
+        "log an event, submit) against a running server, e.g. uvicorn "
+        "backend.asgi:application, and compare the sync and async endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Base URL of the running server")
+        parser.add_argument('--paths', default='sync,async', help="Endpoint sets to test: sync, async or both")
+        parser.add_argument('--candidates', default='50,100,200', help="Comma-separated concurrency levels")
+        parser.add_argument('--questions', type=int, default=40)
+        parser.add_argument('--polls', type=int, default=5, help="Violation polls per candidate")
+        parser.add_argument('--think-time', type=float, default=0.5, help="Mean seconds between a candidate's requests")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Per-request timeout in seconds")
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        if url.scheme != 'http':
+            raise CommandError("Only plain http:// servers are supported")
+
+        paths = options['paths'].split(',')
+        unknown = set(paths) - set(PATH_PREFIXES)
+        if unknown:
+            raise CommandError(f"Unknown path set(s): {', '.join(sorted(unknown))}")
+
+        levels = [int(level) for level in options['candidates'].split(',')]
+
+        self.stdout.write(f"{'path':<6} {'cands':>6} {'ok':>6} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for path in paths:
+            for level in levels:
+                exam, user_ids = self.seed(level, options['questions'])
+                try:
+                    result = asyncio.run(self.run_level(url, PATH_PREFIXES[path], exam, user_ids, options))
+                finally:
+                    exam.delete()
+                    User.objects.filter(id__in=user_ids).delete()
+                self.report(path, level, result)
+
+    def report(self, path, level, result):
+        latencies = sorted(result['latencies'])
+        if latencies:
+            p50 = statistics.median(latencies) * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+            worst = latencies[-1] * 1000
+        else:
+            p50 = p95 = worst = 0.0
+        rate = len(latencies) / result['wall'] if result['wall'] else 0.0
+
+        line = (
+            f"{path:<6} {level:>6} {result['completed']:>6} {result['errors']:>6} "
+            f"{rate:>8.1f} {p50:>8.1f} {p95:>8.1f} {worst:>8.1f}"
+        )
+        self.stdout.write(self.style.WARNING(line) if result['errors'] else line)
+
+    async def run_level(self, url, prefix, exam, user_ids, options):
+        result = {'latencies': [], 'errors': 0, 'completed': 0}
+        question_ids = list(exam.question_ids)
+
+        async def timed(connection, method, path, body=None):
+            started = time.perf_counter()
+            status, payload = await connection.request(method, path, body)
+            if status >= 400:
+                raise RuntimeError(f"{method} {path} returned {status}: {payload[:200]!r}")
+            result['latencies'].append(time.perf_counter() - started)
+            return payload
+
+        async def think():
+            await asyncio.sleep(random.expovariate(1 / options['think_time']) if options['think_time'] else 0)
+
+        async def candidate(user_id):
+            connection = HTTPConnection(url.hostname, url.port or 80, options['timeout'])
+            exams = f"{prefix}/exams/{exam.id}"
+            proctor = f"{prefix}/proctor"
+            try:
+                await timed(connection, 'POST', f"{exams}/start/", {"user_id": user_id})
+                await timed(connection, 'GET', f"{exams}/questions/?user_id={user_id}")
+                for _ in range(options['polls']):
+                    await think()
+                    await timed(connection, 'GET', f"{proctor}/violations/?user_id={user_id}&exam_id={exam.id}")
+                await think()
+                await timed(connection, 'POST', f"{proctor}/log/", {
+                    "user_id": user_id, "exam_id": exam.id, "event": "tab_switch"
+                })
+                await think()
+                await timed(connection, 'POST', f"{exams}/submit/", {
+                    "user_id": user_id,
+                    "answers": [
+                        {"question_id": question_id, "selected_option": random.choice('ABCD')}
+                        for question_id in question_ids
+                    ],
+                })
+                result['completed'] += 1
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, RuntimeError, ValueError) as e:
+                result['errors'] += 1
+                if result['errors'] <= 3:
+                    self.stderr.write(f"Candidate {user_id} failed: {e}")
+            finally:
+                await connection.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(candidate(user_id) for user_id in user_ids))
+        result['wall'] = time.perf_counter() - started
+        return result
+
+    def seed(self, candidates, questions):
+        tag = uuid.uuid4().hex[:8]
+        now = timezone.now()
+        exam = Exam.objects.create(
+            title=f"load-{tag}",
+            duration=60,
+            department=f"load-{tag}",
+            start_time=now - timedelta(minutes=5),
+            end_time=now + timedelta(hours=1),
+        )
+        Question.objects.bulk_create([
+            Question(
+                exam=exam,
+                question_text=f"Question {i}",
+                option_a='a', option_b='b', option_c='c', option_d='d',
+                correct_option=random.choice('ABCD'),
+                slot=slot,
+            )
+            # bulk_create() skips the pre_save signal that assigns slots
+            for i, slot in enumerate(allocate_answer_slots(exam.id, questions))
+        ])
+        record_question_change(exam.id, questions)
+        exam.question_ids = list(Question.objects.filter(exam=exam).values_list('id', flat=True))
+
+        User.objects.bulk_create([
+            User(username=f"load-{tag}-{i}", password='!') for i in range(candidates)
+        ])
+        users = list(User.objects.filter(username__startswith=f"load-{tag}-"))
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, role='student', department=exam.department) for user in users
+        ])
+        return exam, [user.id for user in users]
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from exams.absence import mark_absent_for_closed_exams
+
+
+class Command(BaseCommand):
+    help = "Mark students absent for exams that closed since the last run"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help="Ignore the stored watermark and rescan every closed exam",
+        )
+
+    def handle(self, *args, **options):
+        report = mark_absent_for_closed_exams(full=options['full'])
+
+        for row in report:
+            self.stdout.write(
+                f"Exam {row['exam_id']} ({row['title']}): "
+                f"{row['created']} marked absent, {row['closed']} open attempts graded in {row['seconds']}s"
+            )
+
+        marked = sum(row['created'] for row in report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Marked {marked} students as absent across {len(report)} exam(s)"
+        ))
@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from exams import packing
+from exams.grading import assign_missing_slots, load_saved_answers, upsert_answers
+from exams.models import Answer, Exam, ExamAttempt, Question
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy saved Answer rows into ExamAttempt.packed_answers before switching "
+        "ANSWER_STORAGE to 'packed' (or back again with --unpack)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--exam', type=int, help="Only convert this exam's attempts")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Attempts converted per transaction")
+        parser.add_argument(
+            '--delete-rows',
+            action='store_true',
+            help="Delete the Answer rows once they are packed",
+        )
+        parser.add_argument(
+            '--unpack',
+            action='store_true',
+            help="Write packed answers back to Answer rows and clear them",
+        )
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.order_by('id')
+        if options['exam']:
+            exams = exams.filter(id=options['exam'])
+
+        converted = 0
+        for exam in exams:
+            slots = dict(Question.objects.filter(exam=exam).values_list('id', 'slot'))
+            missing = [question_id for question_id, slot in slots.items() if slot is None]
+            if missing:
+                assign_missing_slots(exam.id, missing)
+                slots = dict(Question.objects.filter(exam=exam).values_list('id', 'slot'))
+            if options['unpack']:
+                attempts = ExamAttempt.objects.filter(exam=exam).exclude(packed_answers=b'')
+            else:
+                attempts = ExamAttempt.objects.filter(exam=exam, answer__isnull=False).distinct()
+            attempt_ids = list(attempts.order_by('id').values_list('id', flat=True))
+
+            for start in range(0, len(attempt_ids), options['batch_size']):
+                batch = attempt_ids[start:start + options['batch_size']]
+                with transaction.atomic():
+                    if options['unpack']:
+                        self.unpack(batch, slots)
+                    else:
+                        self.pack(batch, slots, options['delete_rows'])
+                converted += len(batch)
+
+            if attempt_ids:
+                self.stdout.write(f"Exam {exam.id} ({exam.title}): {len(attempt_ids)} attempt(s)")
+
+        verb = "Unpacked" if options['unpack'] else "Packed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} answers for {converted} attempt(s)"))
+
+    def pack(self, attempt_ids, slots, delete_rows):
+        saved = load_saved_answers(attempt_ids)
+        attempts = list(ExamAttempt.objects.filter(id__in=attempt_ids).only('id', 'packed_answers'))
+        for attempt in attempts:
+            attempt.packed_answers = packing.merge(attempt.packed_answers, {
+                slots[question_id]: option
+                for question_id, option in saved[attempt.id].items()
+                if option in packing.OPTION_CODES
+            })
+        ExamAttempt.objects.bulk_update(attempts, ['packed_answers'])
+
+        if delete_rows:
+            Answer.objects.filter(attempt_id__in=attempt_ids).delete()
+
+    def unpack(self, attempt_ids, slots):
+        questions = {slot: question_id for question_id, slot in slots.items()}
+        attempts = ExamAttempt.objects.filter(id__in=attempt_ids).values_list('id', 'packed_answers')
+        for attempt_id, packed in attempts:
+            upsert_answers(attempt_id, {
+                questions[slot]: option
+                for slot, option in packing.decode(packed).items()
+                # Slots of deleted questions have nowhere to go
+                if slot in questions
+            })
+        ExamAttempt.objects.filter(id__in=attempt_ids).update(packed_answers=b'')
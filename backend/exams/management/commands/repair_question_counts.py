@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from backend.cache import bump_version
+from exams.models import Exam
+
+
+class Command(BaseCommand):
+    help = "Recompute Exam.question_count from the Question table and fix any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="Report drifted exams without updating them",
+        )
+
+    def handle(self, *args, **options):
+        exams = Exam.objects.annotate(actual=Count('question')).order_by('id')
+
+        drifted = []
+        for exam in exams:
+            if exam.question_count != exam.actual:
+                self.stdout.write(
+                    f"Exam {exam.id} ({exam.title}): stored {exam.question_count}, actual {exam.actual}"
+                )
+                drifted.append(exam)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Found {len(drifted)} exam(s) with drifted question counts"))
+            return
+
+        repaired = 0
+        for exam in drifted:
+            # Skipped if a question was added or deleted since the count was
+            # read, rather than overwriting that change with a stale total
+            if Exam.objects.filter(id=exam.id, question_count=exam.question_count).update(question_count=exam.actual):
+                repaired += 1
+            else:
+                self.stdout.write(self.style.WARNING(f"Exam {exam.id} changed while repairing; run again to recheck it"))
+
+        if repaired:
+            # update() skips the signals that invalidate cached exam lists
+            bump_version('exam', 'question')
+
+        self.stdout.write(self.style.SUCCESS(f"Repaired {repaired} exam(s) with drifted question counts"))
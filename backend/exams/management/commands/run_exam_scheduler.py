@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from exams.scheduler import SCHEDULER_BATCH_SIZE, next_due_time, process_due_attempts
+
+
+class Command(BaseCommand):
+    help = "Auto-submit and grade exam attempts as their deadlines pass"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Close whatever is due now and exit (for cron)",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SCHEDULER_BATCH_SIZE,
+            help="Attempts closed per transaction",
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=5.0,
+            help="Longest wait between checks, so newly started attempts are picked up",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            closed = process_due_attempts(batch_size=options['batch_size'])
+            if closed:
+                self.stdout.write(
+                    f"{timezone.now():%H:%M:%S} auto-submitted {closed} attempt(s) "
+                    f"in {time.perf_counter() - started:.3f}s"
+                )
+
+            if options['once']:
+                self.stdout.write(self.style.SUCCESS(f"Auto-submitted {closed} attempt(s)"))
+                return
+
+            due = next_due_time()
+            wait = options['max_sleep']
+            if due is not None:
+                wait = min(wait, max((due - timezone.now()).total_seconds(), 0.0))
+
+            # Don't hold a connection open while idle
+            connection.close()
+            time.sleep(max(wait, 0.05))
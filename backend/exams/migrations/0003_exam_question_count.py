@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:03
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_question_count(apps, schema_editor):
+    Exam = apps.get_model('exams', 'Exam')
+    Question = apps.get_model('exams', 'Question')
+    counts = (
+        Question.objects.filter(exam=OuterRef('pk'))
+        .values('exam')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Exam.objects.update(question_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0002_exam_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_question_count, migrations.RunPython.noop),
+    ]
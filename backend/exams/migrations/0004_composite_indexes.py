@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0003_exam_question_count'),
+        ('users', '0002_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['department', 'allowed_batch', 'start_time', 'end_time'], name='exam_dept_batch_window_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(fields=['student', 'is_submitted', 'exam'], name='attempt_student_submitted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(fields=['exam', 'is_submitted'], name='attempt_exam_submitted_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0005_jobwatermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='shuffle_questions',
+            field=models.BooleanField(default=False),
+        ),
+    ]
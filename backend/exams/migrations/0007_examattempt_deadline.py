@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:27
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_deadlines(apps, schema_editor):
+    ExamAttempt = apps.get_model('exams', 'ExamAttempt')
+    open_attempts = ExamAttempt.objects.filter(is_submitted=False).select_related('exam')
+
+    batch = []
+    for attempt in open_attempts.iterator(chunk_size=2000):
+        exam = attempt.exam
+        attempt.deadline = min(attempt.start_time + timedelta(minutes=exam.duration), exam.end_time)
+        batch.append(attempt)
+        if len(batch) >= 2000:
+            ExamAttempt.objects.bulk_update(batch, ['deadline'])
+            batch = []
+    if batch:
+        ExamAttempt.objects.bulk_update(batch, ['deadline'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_exam_shuffle_questions'),
+        ('users', '0002_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='deadline',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_deadlines, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(fields=['is_submitted', 'deadline'], name='attempt_due_idx'),
+        ),
+    ]
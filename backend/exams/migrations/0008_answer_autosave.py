@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:29
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def drop_duplicate_answers(apps, schema_editor):
+    """Keep only the newest answer per (attempt, question) before adding the constraint"""
+    Answer = apps.get_model('exams', 'Answer')
+    newest = (
+        Answer.objects.values('attempt', 'question')
+        .annotate(keep=Max('id'))
+        .values('keep')
+    )
+    Answer.objects.exclude(id__in=newest).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_examattempt_deadline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='autosave_seq',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(drop_duplicate_answers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='answer',
+            constraint=models.UniqueConstraint(fields=('attempt', 'question'), name='answer_attempt_question_uniq'),
+        ),
+    ]
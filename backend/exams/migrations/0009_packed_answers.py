@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:31
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def assign_slots(apps, schema_editor):
+    """Give existing questions slots 0..n-1 in id order within each exam"""
+    Exam = apps.get_model('exams', 'Exam')
+    Question = apps.get_model('exams', 'Question')
+
+    exam_slots = {}
+    batch = []
+    for question in Question.objects.order_by('exam_id', 'id').only('id', 'exam_id').iterator(chunk_size=2000):
+        question.slot = exam_slots.get(question.exam_id, 0)
+        exam_slots[question.exam_id] = question.slot + 1
+        batch.append(question)
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ['slot'])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ['slot'])
+
+    for exam_id, slot_count in exam_slots.items():
+        Exam.objects.filter(id=exam_id).update(slot_count=slot_count)
+
+    # Cached answer keys predate slots
+    Exam.objects.update(content_version=F('content_version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0008_answer_autosave'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='slot_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='examattempt',
+            name='packed_answers',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='slot',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(assign_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='question',
+            constraint=models.UniqueConstraint(fields=('exam', 'slot'), name='question_exam_slot_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0009_packed_answers'),
+        ('users', '0002_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['created_by', 'start_time', 'id'], name='exam_creator_catalogue_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from users.models import UserProfile
 from django.utils import timezone
 
@@ -8,6 +9,8 @@ class Exam(models.Model):
     duration = models.IntegerField()  
     department = models.CharField(max_length=50)  
     allowed_batch = models.CharField(max_length=20, blank=True)  
+    # Give each student their own question and option order (see exams.shuffling)
+    shuffle_questions = models.BooleanField(default=False)
     
     start_time = models.DateTimeField()  
     end_time = models.DateTimeField()  
@@ -23,13 +26,31 @@ class Exam(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Bumped whenever the exam's questions change; keys cached answer keys
+    content_version = models.PositiveIntegerField(default=0)
+    # Denormalised number of questions, kept in step by exams.signals
+    question_count = models.PositiveIntegerField(default=0)
+    # Answer slots handed out to questions so far (see exams.packing); never reused
+    slot_count = models.PositiveIntegerField(default=0)
+
+    # Maintained with F() updates, so a full save() must not write back stale copies
+    COUNTER_FIELDS = ('content_version', 'question_count', 'slot_count')
+
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
     
     @property
     def total_marks(self):
-        """Calculate total marks based on number of questions"""
-        return self.question_set.count()
+        """Total marks, one per question"""
+        return self.question_count
     
     @property
     def is_active(self):
@@ -49,6 +70,39 @@ class Exam(models.Model):
 
     class Meta:
         ordering = ['-start_time']
+        indexes = [
+            # exam_list: department + batch + open time window
+            models.Index(
+                fields=['department', 'allowed_batch', 'start_time', 'end_time'],
+                name='exam_dept_batch_window_idx',
+            ),
+            # teacher_exam_list: keyset pages in (-start_time, -id) order
+            models.Index(fields=['created_by', 'start_time', 'id'], name='exam_creator_catalogue_idx'),
+        ]
+
+
+def parse_flag(value):
+    """Read a boolean sent as JSON or as a form/query string"""
+    return value in (True, 1, '1', 'true', 'True', 'on')
+
+
+def record_question_change(exam_id, count_delta=0):
+    """
+    Bump the exam's content version after its questions change, adjusting
+    the stored question count by count_delta in the same UPDATE.
+    """
+    changes = {'content_version': F('content_version') + 1}
+    if count_delta:
+        changes['question_count'] = F('question_count') + count_delta
+    Exam.objects.filter(id=exam_id).update(**changes)
+
+
+def allocate_answer_slots(exam_id, count):
+    """Reserve count new answer slots in the exam; returns them as a range"""
+    with transaction.atomic():
+        Exam.objects.filter(id=exam_id).update(slot_count=F('slot_count') + count)
+        end = Exam.objects.values_list('slot_count', flat=True).get(id=exam_id)
+    return range(end - count, end)
 
 
 class Question(models.Model):
@@ -64,10 +118,17 @@ class Question(models.Model):
         ('C', 'C'),
         ('D', 'D'),
     ])
+    # Position of this question's answer in packed answers, assigned on first save
+    slot = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self):
         return self.question_text[:50]
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['exam', 'slot'], name='question_exam_slot_uniq'),
+        ]
+
 
 class ExamAttempt(models.Model):
     STATUS_CHOICES = [
@@ -84,10 +145,23 @@ class ExamAttempt(models.Model):
     is_submitted = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
     violation_count = models.IntegerField(default=0)
+    # When the attempt is auto-submitted by exams.scheduler
+    deadline = models.DateTimeField(null=True, blank=True)
+    # Sequence number of the last autosave applied; older ones are dropped
+    autosave_seq = models.PositiveIntegerField(default=0)
+    # Saved answers when ANSWER_STORAGE is 'packed' (see exams.packing)
+    packed_answers = models.BinaryField(default=b'', blank=True)
 
     class Meta:
         unique_together = ('student', 'exam')
         ordering = ['-start_time']
+        indexes = [
+            # exams.scheduler: open attempts in deadline order
+            models.Index(fields=['is_submitted', 'deadline'], name='attempt_due_idx'),
+            # exam_id is included so exam_list's submitted-exams lookup can be index-only
+            models.Index(fields=['student', 'is_submitted', 'exam'], name='attempt_student_submitted_idx'),
+            models.Index(fields=['exam', 'is_submitted'], name='attempt_exam_submitted_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.user.username} - {self.exam.title}"
@@ -99,4 +173,19 @@ class Answer(models.Model):
     selected_option = models.CharField(max_length=1)
 
     def __str__(self):
-        return f"Answer for {self.question.id}"
\ No newline at end of file
+        return f"Answer for {self.question.id}"
+
+    class Meta:
+        constraints = [
+            # One saved answer per question; autosave upserts against it
+            models.UniqueConstraint(fields=['attempt', 'question'], name='answer_attempt_question_uniq'),
+        ]
+
+class JobWatermark(models.Model):
+    """High-water mark for periodic jobs, so each run only handles new work"""
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.watermark}"
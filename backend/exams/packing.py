@@ -0,0 +1,76 @@
+# exams/packing.py
+"""
+Packed answer storage: one byte string per attempt instead of an Answer
+row per question.
+
+Every question owns a fixed answer slot in its exam (Question.slot). Slot
+i occupies bits 3i..3i+2 of a little-endian integer holding 0 for
+unanswered or 1-4 for options A-D, so 100 questions pack into 38 bytes.
+Answer keys are packed the same way, and grading compares the two with
+a handful of integer operations instead of a loop over questions.
+"""
+from .shuffling import OPTION_LETTERS
+
+
+BITS_PER_SLOT = 3
+SLOT_MASK = (1 << BITS_PER_SLOT) - 1
+
+OPTION_CODES = {letter: code for code, letter in enumerate(OPTION_LETTERS, start=1)}
+
+
+def packed_size(slot_count):
+    return (slot_count * BITS_PER_SLOT + 7) // 8
+
+
+def to_int(packed):
+    return int.from_bytes(bytes(packed or b''), 'little')
+
+
+def to_bytes(value):
+    return value.to_bytes(packed_size((value.bit_length() + BITS_PER_SLOT - 1) // BITS_PER_SLOT), 'little')
+
+
+def encode(selections):
+    """Pack {slot: option letter} into a byte string"""
+    return merge(b'', selections)
+
+
+def decode(packed):
+    """Unpack a byte string into {slot: option letter}"""
+    value = to_int(packed)
+    selections = {}
+    slot = 0
+    while value:
+        code = value & SLOT_MASK
+        if code:
+            selections[slot] = OPTION_LETTERS[code - 1]
+        value >>= BITS_PER_SLOT
+        slot += 1
+    return selections
+
+
+def merge(packed, changes):
+    """Return packed with the {slot: option letter} changes applied"""
+    value = to_int(packed)
+    for slot, option in changes.items():
+        shift = slot * BITS_PER_SLOT
+        value = (value & ~(SLOT_MASK << shift)) | (OPTION_CODES[option] << shift)
+    return to_bytes(value)
+
+
+def _nonzero_slots(value):
+    """The lowest bit of every slot that holds a non-zero code"""
+    slots = value.bit_length() // BITS_PER_SLOT + 1
+    # 0b...001001001: (8**slots - 1) / 7
+    low_bits = ((1 << (slots * BITS_PER_SLOT)) - 1) // SLOT_MASK
+    return (value | value >> 1 | value >> 2) & low_bits
+
+
+def count_matches(packed, packed_key):
+    """
+    Number of answered slots equal to the key. packed_key is an int, with
+    0 in the slots of deleted questions so they never match.
+    """
+    answers = to_int(packed)
+    differing = _nonzero_slots(answers ^ packed_key)
+    return (_nonzero_slots(answers) & ~differing).bit_count()
@@ -0,0 +1,85 @@
+# exams/papers.py
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+
+from backend.cache import cached
+from .models import Question
+from .serializers import QuestionSerializer
+from .shuffling import shuffle_paper
+
+
+# Papers are immutable per (exam, content_version), so a long timeout is safe
+PAPER_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+class QuestionPaper:
+    """An exam's serialised questions, rendered once to JSON bytes"""
+    __slots__ = ('questions', 'body', 'gzipped', 'digest')
+
+    def __init__(self, questions, compress):
+        self.questions = questions
+        self.body = JSONRenderer().render(questions)
+        self.gzipped = gzip.compress(self.body, mtime=0) if compress else None
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+def render_paper(exam):
+    questions = QuestionSerializer(Question.objects.filter(exam_id=exam.id), many=True).data
+    return QuestionPaper([dict(question) for question in questions], settings.QUESTION_PAPER_GZIP)
+
+
+def get_paper(exam):
+    return cached(
+        'question_paper', (exam.id, exam.content_version), (),
+        lambda: render_paper(exam),
+        timeout=PAPER_CACHE_TIMEOUT
+    )
+
+
+def paper_response(request, paper, exam, student):
+    """
+    Serve a paper with a strong ETag, answering If-None-Match with 304.
+
+    Shuffled exams are permuted per student from the cached base paper and
+    sent uncompressed; their ETag is derived from the base paper and the
+    student, so a 304 needs no rendering at all.
+    """
+    if exam.shuffle_questions:
+        return conditional_response(
+            request,
+            f'"{paper.digest}-s{student.id}"',
+            lambda: JSONRenderer().render(shuffle_paper(paper.questions, exam.id, student.id))
+        )
+
+    if paper.gzipped is not None and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        return conditional_response(
+            request, f'"{paper.digest}-gz"', lambda: paper.gzipped, content_encoding='gzip'
+        )
+
+    return conditional_response(request, f'"{paper.digest}"', lambda: paper.body)
+
+
+def conditional_response(request, etag, get_body, content_encoding=None):
+    # If-None-Match uses weak comparison, so ignore W/ prefixes added by proxies
+    client_etags = {
+        tag[2:] if tag.startswith('W/') else tag
+        for tag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    }
+    if etag in client_etags or '*' in client_etags:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(get_body(), content_type='application/json')
+        if content_encoding:
+            response['Content-Encoding'] = content_encoding
+
+    # Each encoding has its own ETag, as required for strong validators
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    # Clients may keep the paper but must revalidate before reusing it
+    response['Cache-Control'] = 'private, no-cache'
+    return response
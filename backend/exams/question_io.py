@@ -0,0 +1,154 @@
+# exams/question_io.py
+"""
+Bulk question import and export.
+
+Imports stream rows from CSV, TSV, JSON Lines or an .xlsx sheet (needs
+openpyxl), validate them one at a time and insert them with bulk_create
+in chunks, all in one transaction. Exports stream rows straight from a
+database cursor, so neither side holds a whole question bank in memory.
+"""
+from django.db import transaction
+
+from backend.cache import bump_version
+from backend.pagination import (
+    ROW_FILE_FORMATS, RowFileError, check_columns, detect_row_format, read_rows, stream_rows
+)
+from .models import Question, allocate_answer_slots, record_question_change
+from .shuffling import OPTION_LETTERS
+
+
+FIELDS = ['question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option']
+
+FORMATS = {**ROW_FILE_FORMATS, '.xlsx': 'xlsx'}
+
+EXPORT_FORMATS = ('csv', 'tsv', 'jsonl')
+
+IMPORT_CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 500
+
+# Errors beyond this are counted but not listed
+MAX_REPORTED_ERRORS = 100
+
+OPTION_MAX_LENGTH = Question._meta.get_field('option_a').max_length
+
+
+def detect_format(filename, fmt=None):
+    return detect_row_format(filename, fmt, FORMATS)
+
+
+def iter_rows(stream, fmt):
+    """Yield (row number, dict) from a binary stream in the given format"""
+    if fmt == 'xlsx':
+        return _iter_xlsx_rows(stream)
+    return read_rows(stream, fmt, FIELDS)
+
+
+def _iter_xlsx_rows(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise RowFileError("Importing .xlsx files needs the openpyxl package")
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise RowFileError(f"Not a readable .xlsx file: {e}")
+
+    rows = workbook.active.iter_rows(values_only=True)
+    header = [str(cell or '') for cell in next(rows, ())]
+    check_columns(header, FIELDS)
+    for number, values in enumerate(rows, start=2):
+        if any(value is not None for value in values):
+            yield number, dict(zip(header, ('' if value is None else str(value) for value in values)))
+    workbook.close()
+
+
+def validate_row(row):
+    """Return (question fields, errors) for one input row"""
+    if row is None:
+        return None, ["Not a JSON object"]
+
+    values = {}
+    errors = []
+    for field in FIELDS:
+        value = row.get(field)
+        value = '' if value is None else str(value).strip()
+        if not value:
+            errors.append(f"{field} is required")
+        values[field] = value
+
+    for field in FIELDS[1:5]:
+        if len(values[field]) > OPTION_MAX_LENGTH:
+            errors.append(f"{field} is longer than {OPTION_MAX_LENGTH} characters")
+
+    values['correct_option'] = values['correct_option'].upper()
+    if values['correct_option'] and values['correct_option'] not in OPTION_LETTERS:
+        errors.append("correct_option must be A, B, C, or D")
+
+    return (None if errors else values), errors
+
+
+def import_questions(exam, rows, skip_invalid=False, dry_run=False, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Validate and insert rows of (row number, dict) as questions of exam.
+
+    Without skip_invalid, any invalid row rolls the whole import back.
+    Returns a report with the number imported and the per-row errors.
+    """
+    imported = 0
+    error_count = 0
+    errors = []
+
+    def flush(chunk):
+        for question, slot in zip(chunk, allocate_answer_slots(exam.id, len(chunk))):
+            question.slot = slot
+        Question.objects.bulk_create(chunk)
+
+    with transaction.atomic():
+        chunk = []
+        for number, row in rows:
+            values, row_errors = validate_row(row)
+            if row_errors:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": number, "errors": row_errors})
+                continue
+
+            chunk.append(Question(exam=exam, **values))
+            imported += 1
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+
+        if chunk:
+            flush(chunk)
+
+        if dry_run or (error_count and not skip_invalid):
+            transaction.set_rollback(True)
+            if not dry_run:
+                imported = 0
+        elif imported:
+            # bulk_create() skips the signals that keep these in step
+            record_question_change(exam.id, imported)
+            bump_version('question')
+
+    return {
+        "imported": imported,
+        "error_count": error_count,
+        "errors": errors,
+        "dry_run": dry_run,
+    }
+
+
+def export_questions(exam_id, fmt, using=None):
+    """
+    Yield an exam's questions, answers included, as CSV, TSV or JSON Lines
+    text, read from the using database alias (None lets the router pick)
+    """
+    questions = (
+        Question.objects.using(using).filter(exam_id=exam_id)
+        .order_by('id')
+        .values_list(*FIELDS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return stream_rows(FIELDS, questions, 'ndjson' if fmt == 'jsonl' else fmt)
@@ -0,0 +1,123 @@
+# exams/scheduler.py
+"""
+Server-side exam timer.
+
+Every attempt gets a deadline when it starts: start + duration, capped at
+the exam's end_time, and recomputed if the exam's timing is edited while
+the attempt is open. ExamAttempt's (is_submitted, deadline) index makes
+the open attempts a queue ordered by deadline, so the scheduler
+(run_exam_scheduler) only ever reads the attempts that are due. It
+auto-submits them in batches, grading whatever answers were saved.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .catalogue import bump_attempt_versions
+from .grading import saved_scores
+from .models import ExamAttempt
+
+
+# Attempts are closed this long after their deadline, so a submit that was
+# already in flight at the deadline wins over the scheduler
+SUBMIT_GRACE = timedelta(seconds=30)
+
+SCHEDULER_BATCH_SIZE = 500
+
+
+def attempt_deadline(exam, start_time):
+    return min(start_time + timedelta(minutes=int(exam.duration)), exam.end_time)
+
+
+def reschedule_open_attempts(exam):
+    """Move the deadlines of the exam's open attempts to match its current timing"""
+    attempts = list(ExamAttempt.objects.filter(exam=exam, is_submitted=False).only('id', 'start_time'))
+    for attempt in attempts:
+        attempt.deadline = attempt_deadline(exam, attempt.start_time)
+    ExamAttempt.objects.bulk_update(attempts, ['deadline'], batch_size=SCHEDULER_BATCH_SIZE)
+
+
+def submit_window_closed(attempt, now):
+    """Whether a submit at now comes too late to save its answers"""
+    deadline = attempt.deadline or attempt_deadline(attempt.exam, attempt.start_time)
+    return now > deadline + SUBMIT_GRACE
+
+
+def close_expired_attempts(attempts, end_time=None):
+    """
+    Auto-submit attempts whose time is up, scoring their saved answers.
+    The attempts need their exam loaded (select_related('exam')).
+    end_time defaults to each attempt's deadline.
+
+    Returns the number of attempts closed.
+    """
+    attempts = [attempt for attempt in attempts if not attempt.is_submitted]
+    if not attempts:
+        return 0
+
+    scores = saved_scores(attempts)
+
+    for attempt in attempts:
+        attempt.score = scores[attempt.id]
+        attempt.is_submitted = True
+        attempt.status = 'submitted'
+        attempt.end_time = end_time or attempt.deadline or attempt_deadline(attempt.exam, attempt.start_time)
+
+    ExamAttempt.objects.bulk_update(
+        attempts, ['score', 'is_submitted', 'status', 'end_time'], batch_size=SCHEDULER_BATCH_SIZE
+    )
+    # bulk_update() skips the model signals
+    bump_attempt_versions(*(attempt.exam.created_by_id for attempt in attempts))
+    return len(attempts)
+
+
+def close_attempt(attempt_id, end_time=None):
+    """
+    Auto-submit one attempt, e.g. at the violation limit, grading its saved
+    answers the same way the scheduler does. Returns the closed attempt,
+    or None if it was already submitted.
+    """
+    with transaction.atomic():
+        attempt = (
+            ExamAttempt.objects.select_related('exam')
+            .select_for_update(of=('self',))
+            .filter(id=attempt_id, is_submitted=False)
+            .first()
+        )
+        if attempt is None:
+            return None
+        close_expired_attempts([attempt], end_time)
+    return attempt
+
+
+def due_attempts(now):
+    return ExamAttempt.objects.filter(is_submitted=False, deadline__lte=now - SUBMIT_GRACE)
+
+
+def process_due_attempts(now=None, batch_size=SCHEDULER_BATCH_SIZE):
+    """Close every attempt that has fallen due, one batch per transaction"""
+    now = now or timezone.now()
+    closed = 0
+
+    while True:
+        with transaction.atomic():
+            # Other scheduler processes skip the rows this batch holds
+            batch = list(
+                due_attempts(now)
+                .select_related('exam')
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('deadline')[:batch_size]
+            )
+            closed += close_expired_attempts(batch)
+
+        if len(batch) < batch_size:
+            return closed
+
+
+def next_due_time():
+    """When the next open attempt falls due, None if there are none"""
+    deadline = ExamAttempt.objects.filter(
+        is_submitted=False, deadline__isnull=False
+    ).order_by('deadline').values_list('deadline', flat=True).first()
+    return deadline + SUBMIT_GRACE if deadline else None
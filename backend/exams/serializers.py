@@ -10,4 +10,4 @@ class ExamSerializer(serializers.ModelSerializer):
 class QuestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Question
-        exclude = ['correct_option']
+        exclude = ['correct_option', 'slot']
@@ -0,0 +1,64 @@
+# exams/shuffling.py
+"""
+Deterministic per-student question and option order.
+
+Permutations are derived from (exam, student[, question]) on the fly, so
+nothing is stored per student and every request for the same student
+sees the same order. Option permutations are per question, so they do
+not depend on where the question lands in the shuffled paper.
+"""
+import hashlib
+import random
+
+
+OPTION_LETTERS = ('A', 'B', 'C', 'D')
+
+
+def _rng(*parts):
+    seed = hashlib.sha256(':'.join(str(part) for part in parts).encode()).digest()
+    return random.Random(int.from_bytes(seed[:8], 'big'))
+
+
+def question_order(exam_id, student_id, count):
+    """order[i] is the base paper index shown in position i"""
+    order = list(range(count))
+    _rng('questions', exam_id, student_id).shuffle(order)
+    return order
+
+
+def option_order(exam_id, student_id, question_id):
+    """order[i] is the index in OPTION_LETTERS of the option shown as letter i"""
+    order = list(range(len(OPTION_LETTERS)))
+    _rng('options', exam_id, student_id, question_id).shuffle(order)
+    return order
+
+
+def shuffle_paper(questions, exam_id, student_id):
+    """Apply the student's permutations to serialised base-paper questions"""
+    shuffled = []
+    for index in question_order(exam_id, student_id, len(questions)):
+        question = questions[index]
+        options = option_order(exam_id, student_id, question['id'])
+
+        shown = dict(question)
+        for position, original in enumerate(options):
+            shown[f'option_{OPTION_LETTERS[position].lower()}'] = (
+                question[f'option_{OPTION_LETTERS[original].lower()}']
+            )
+        shuffled.append(shown)
+    return shuffled
+
+
+def option_unshuffler(exam_id, student_id):
+    """
+    Return a function mapping (question_id, shown letter) to the letter
+    of the same option in the base paper, which is what correct_option
+    refers to. Anything that is not a shown letter is returned unchanged.
+    """
+    def unshuffle(question_id, option):
+        if option not in OPTION_LETTERS:
+            return option
+        options = option_order(exam_id, student_id, question_id)
+        return OPTION_LETTERS[options[OPTION_LETTERS.index(option)]]
+
+    return unshuffle
@@ -0,0 +1,62 @@
+# exams/signals.py
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from backend.cache import bump_version
+from .catalogue import bump_attempt_versions
+from .models import Exam, Question, ExamAttempt, allocate_answer_slots, record_question_change
+from .scheduler import reschedule_open_attempts
+
+
+@receiver(post_save, sender=Exam)
+@receiver(post_delete, sender=Exam)
+def exam_changed(sender, **kwargs):
+    bump_version('exam')
+
+
+@receiver(post_save, sender=Exam)
+def exam_rescheduled(sender, instance, created, **kwargs):
+    # Attempts in progress follow edits to the exam's duration or end_time
+    if not created:
+        reschedule_open_attempts(instance)
+
+
+@receiver(pre_save, sender=Question)
+def question_slot(sender, instance, **kwargs):
+    if instance.slot is None:
+        instance.slot = allocate_answer_slots(instance.exam_id, 1)[0]
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created, **kwargs):
+    record_question_change(instance.exam_id, 1 if created else 0)
+    bump_version('question')
+
+
+def deleted_with_exam(origin):
+    """Whether a post_delete comes from deleting an exam (or a queryset of them)"""
+    return isinstance(origin, Exam) or (isinstance(origin, QuerySet) and origin.model is Exam)
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting an exam deletes its questions and attempts one signal at a
+    # time; the exam's own 'exam' bump covers them
+    if deleted_with_exam(origin):
+        return
+    record_question_change(instance.exam_id, -1)
+    bump_version('question')
+
+
+@receiver(post_save, sender=ExamAttempt)
+def attempt_saved(sender, instance, **kwargs):
+    # Catalogues only count submitted attempts, so starting one changes nothing
+    if instance.is_submitted:
+        bump_attempt_versions(instance.exam.created_by_id)
+
+
+@receiver(post_delete, sender=ExamAttempt)
+def attempt_deleted(sender, instance, origin=None, **kwargs):
+    if instance.is_submitted and not deleted_with_exam(origin):
+        bump_attempt_versions(instance.exam.created_by_id)
@@ -0,0 +1,78 @@
+# exams/submission.py
+"""
+Exam-taking steps shared by the sync views (exams.views) and their async
+counterparts (exams.async_views). Each returns plain data for the view to
+wrap in its own response type; the async views run them in a thread.
+"""
+import logging
+
+from django.utils import timezone
+
+from proctoring.constants import MAX_VIOLATIONS
+from .grading import GradingError, get_answer_key, parse_answers, submit_attempt
+from .scheduler import attempt_deadline, close_attempt, submit_window_closed
+from .shuffling import option_unshuffler
+
+
+logger = logging.getLogger(__name__)
+
+
+def started_exam_data(attempt, exam):
+    """Response body for a started (or resumed) attempt"""
+    deadline = attempt.deadline or attempt_deadline(exam, attempt.start_time)
+
+    return {
+        "message": "Exam started",
+        "start_time": attempt.start_time,
+        "duration": exam.duration,
+        "deadline": deadline,
+        # Counted on the server, so the client's clock doesn't matter
+        "remaining_seconds": max(int((deadline - timezone.now()).total_seconds()), 0),
+        "autosave_seq": attempt.autosave_seq
+    }
+
+
+def submit_answers(attempt, answers):
+    """
+    Submit an attempt (with its exam loaded) with the answers changed
+    since its last autosave. Returns (response body, status).
+    """
+    if attempt.is_submitted:
+        return {"error": "Already submitted"}, 400
+
+    exam = attempt.exam
+
+    # Answers sent within SUBMIT_GRACE of the deadline still count
+    if submit_window_closed(attempt, timezone.now()):
+        # Same as the scheduler would do: grade whatever was saved in time
+        attempt = close_attempt(attempt.id)
+        if attempt is None:
+            return {"error": "Already submitted"}, 400
+        logger.info("Attempt %s submitted after its deadline", attempt.id, extra={'attempt_id': attempt.id, 'score': attempt.score})
+        return {"message": "Time over. Exam auto-submitted.", "score": attempt.score}, 200
+
+    if attempt.violation_count >= MAX_VIOLATIONS:
+        # The answers in this request are dropped; the saved ones are graded
+        attempt = close_attempt(attempt.id, timezone.now())
+        if attempt is None:
+            return {"error": "Already submitted"}, 400
+        logger.info("Attempt %s closed at the violation limit", attempt.id, extra={'attempt_id': attempt.id})
+        return {"message": "Violation limit exceeded. Exam auto-submitted.", "score": attempt.score}, 200
+
+    if not isinstance(answers, list):
+        return {"error": "answers must be a list"}, 400
+
+    unshuffle = option_unshuffler(exam.id, attempt.student_id) if exam.shuffle_questions else None
+    answer_key = get_answer_key(exam)
+
+    try:
+        selections = parse_answers(answer_key, answers, unshuffle)
+    except GradingError as e:
+        return {"error": str(e)}, 400
+
+    score = submit_attempt(attempt, answer_key, selections)
+    if score is None:
+        return {"error": "Already submitted"}, 400
+
+    logger.info("Attempt %s submitted", attempt.id, extra={'attempt_id': attempt.id, 'score': score})
+    return {"message": "Exam submitted", "score": score}, 200
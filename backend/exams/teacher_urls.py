@@ -10,6 +10,8 @@ from .teacher_views import (
 from .admin_views import (
     admin_question_list,
     admin_create_question,
+    admin_import_questions,
+    admin_export_questions,
     admin_update_question,
     admin_delete_question,
 )
@@ -24,6 +26,8 @@ urlpatterns = [
     # Question Management 
     path('exams/<int:exam_id>/questions/', admin_question_list, name='teacher_question_list'),
     path('exams/<int:exam_id>/questions/create/', admin_create_question, name='teacher_create_question'),
+    path('exams/<int:exam_id>/questions/import/', admin_import_questions, name='teacher_import_questions'),
+    path('exams/<int:exam_id>/questions/export/', admin_export_questions, name='teacher_export_questions'),
     path('questions/<int:question_id>/update/', admin_update_question, name='teacher_update_question'),
     path('questions/<int:question_id>/delete/', admin_delete_question, name='teacher_delete_question'),
     
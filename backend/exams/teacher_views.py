@@ -1,12 +1,23 @@
 # exams/teacher_views.py (FIXED BATCH FILTERING)
+import logging
+
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.utils import timezone
 from django.db.models import Q, Avg, Count
-from .models import Exam, Question, ExamAttempt
+from backend.cache import cached
+from backend.db_routers import reporting_view
+from backend.pagination import CursorError, keyset_page, page_size_from
+from .catalogue import (
+    CATALOGUE_ORDERING, EXAM_STATUSES, attempts_entity, catalogue_cache_key, catalogue_filters, filter_catalogue,
+    status_flags
+)
+from .models import Exam, ExamAttempt, parse_flag
 from users.models import UserProfile
-from .serializers import ExamSerializer, QuestionSerializer
+
+
+logger = logging.getLogger(__name__)
 
 
 def should_student_take_exam(student, exam):
@@ -20,6 +31,23 @@ def should_student_take_exam(student, exam):
     return student.batch == exam.allowed_batch
 
 
+def eligible_exams_by_group(students, exams):
+    """
+    Map (department, batch) -> exams those students should take.
+
+    Eligibility only depends on department and batch, so it is evaluated
+    once per distinct group instead of once per student.
+    """
+    eligible = {}
+    for student in students:
+        group = (student.department, student.batch)
+        if group not in eligible:
+            eligible[group] = [
+                exam for exam in exams if should_student_take_exam(student, exam)
+            ]
+    return eligible
+
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -37,12 +65,45 @@ def teacher_exam_list(request):
     if profile.role != 'teacher':
         return Response({"error": "Access denied. Teachers only."}, status=403)
     
-    exams = Exam.objects.filter(created_by=profile)
+    filters = catalogue_filters(request.query_params)
+    # A teacher's catalogue only ever holds their own exams
+    filters['created_by'] = ''
+    if filters['status'] and filters['status'] not in EXAM_STATUSES:
+        return Response({"error": f"status must be one of {', '.join(EXAM_STATUSES)}"}, status=400)
+
+    cursor = request.query_params.get('cursor') or None
+    try:
+        page_size = page_size_from(request.query_params)
+        build = lambda: build_teacher_exam_list(profile, filters, cursor, page_size)
+        if filters['status']:
+            # Which exams match moves with the clock, so don't cache these
+            page = build()
+        else:
+            page = cached(
+                'teacher_exam_list', (profile.id, catalogue_cache_key(filters, cursor, page_size)),
+                ('exam', 'question', attempts_entity(profile.id)), build
+            )
+    except CursorError as e:
+        return Response({"error": str(e)}, status=400)
+    
+    # Status flags depend on the current time, so they are not cached
+    now = timezone.now()
+    for exam in page['results']:
+        exam.update(status_flags(exam, now))
+    
+    return Response(page)
+
+
+def build_teacher_exam_list(profile, filters, cursor, page_size):
+    exams = Exam.objects.filter(created_by=profile).annotate(
+        num_submitted=Count('examattempt', filter=Q(examattempt__is_submitted=True)),
+    )
+    exams, next_cursor = keyset_page(filter_catalogue(exams, filters), CATALOGUE_ORDERING, cursor, page_size)
     
     exam_data = []
     for exam in exams:
-        question_count = Question.objects.filter(exam=exam).count()
-        attempt_count = ExamAttempt.objects.filter(exam=exam, is_submitted=True).count()
+        question_count = exam.question_count
+        attempt_count = exam.num_submitted
         
         exam_data.append({
             'id': exam.id,
@@ -50,17 +111,15 @@ def teacher_exam_list(request):
             'duration': exam.duration,
             'department': exam.department,
             'allowed_batch': exam.allowed_batch,
+            'shuffle_questions': exam.shuffle_questions,
             'start_time': exam.start_time,
             'end_time': exam.end_time,
             'total_marks': question_count,
             'question_count': question_count,
             'attempts': attempt_count,
-            'is_active': exam.is_active,
-            'is_upcoming': exam.is_upcoming,
-            'is_expired': exam.is_expired
         })
     
-    return Response(exam_data)
+    return {"results": exam_data, "next": next_cursor, "page_size": page_size}
 
 
 
@@ -103,10 +162,12 @@ def teacher_create_exam(request):
         duration=duration,
         department=profile.department,
         allowed_batch=allowed_batch,
+        shuffle_questions=parse_flag(request.data.get('shuffle_questions', False)),
         start_time=start_dt,
         end_time=end_dt,
         created_by=profile
     )
+    logger.info("Teacher %s created exam %s", profile.id, exam.id, extra={'exam_id': exam.id, 'teacher_id': profile.id})
     
     return Response({
         "message": "Exam created successfully",
@@ -117,6 +178,7 @@ def teacher_create_exam(request):
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@reporting_view
 def teacher_student_performance(request):
     user_id = request.query_params.get('user_id')
     exam_id = request.query_params.get('exam_id')
@@ -150,36 +212,48 @@ def teacher_student_performance(request):
         if exam.allowed_batch and exam.allowed_batch.strip():
             students_query = students_query.filter(batch=exam.allowed_batch)
         
-        all_students = students_query.select_related('user')
+        all_students = list(students_query.select_related('user'))
+        total_marks = exam.total_marks
         
-        student_data = []
-        submitted_count = 0
-        absent_count = 0
-        not_attempted_count = 0
-        total_score = 0
+        eligible_attempts = ExamAttempt.objects.filter(exam=exam, student__in=students_query)
+        attempts = {attempt.student_id: attempt for attempt in eligible_attempts}
+        
+        totals = eligible_attempts.aggregate(
+            attempted=Count('id'),
+            submitted=Count('id', filter=Q(is_submitted=True)),
+            avg_score=Avg('score', filter=Q(is_submitted=True)),
+        )
+        submitted_count = totals['submitted']
+        unsubmitted_count = totals['attempted'] - submitted_count
+        missing_count = len(all_students) - totals['attempted']
+        
+        if exam_expired:
+            absent_count = unsubmitted_count + missing_count
+            not_attempted_count = 0
+        else:
+            absent_count = 0
+            not_attempted_count = missing_count
         
+        student_data = []
         for student in all_students:
-            try:
-                attempt = ExamAttempt.objects.get(student=student, exam=exam)
-                
+            attempt = attempts.get(student.id)
+            
+            if attempt is not None:
                 if attempt.is_submitted:
                     status = 'submitted'
-                    submitted_count += 1
-                    total_score += attempt.score
                 elif exam_expired:
                     status = 'absent'
-                    absent_count += 1
                 else:
                     status = 'in_progress'
                 
-                percentage = (attempt.score / exam.total_marks * 100) if exam.total_marks > 0 else 0
+                percentage = (attempt.score / total_marks * 100) if total_marks > 0 else 0
                 
                 student_info = {
                     'student_id': student.id,
                     'student_name': student.user.username,
                     'batch': student.batch,
                     'score': attempt.score,
-                    'total_marks': exam.total_marks,
+                    'total_marks': total_marks,
                     'percentage': round(percentage, 2),
                     'status': status,
                     'violations': attempt.violation_count,
@@ -188,20 +262,15 @@ def teacher_student_performance(request):
                     'attempted': True
                 }
                 
-            except ExamAttempt.DoesNotExist:
-                if exam_expired:
-                    status = 'absent'
-                    absent_count += 1
-                else:
-                    status = 'not_attempted'
-                    not_attempted_count += 1
+            else:
+                status = 'absent' if exam_expired else 'not_attempted'
                 
                 student_info = {
                     'student_id': student.id,
                     'student_name': student.user.username,
                     'batch': student.batch,
                     'score': 0,
-                    'total_marks': exam.total_marks,
+                    'total_marks': total_marks,
                     'percentage': 0,
                     'status': status,
                     'violations': 0,
@@ -212,15 +281,15 @@ def teacher_student_performance(request):
             
             student_data.append(student_info)
         
-        avg_score = (total_score / submitted_count) if submitted_count > 0 else 0
-        avg_percentage = (avg_score / exam.total_marks * 100) if exam.total_marks > 0 else 0
+        avg_score = totals['avg_score'] or 0
+        avg_percentage = (avg_score / total_marks * 100) if total_marks > 0 else 0
         
         student_data.sort(key=lambda x: x['score'], reverse=True)
         
         return Response({
             'exam_title': exam.title,
             'exam_id': exam.id,
-            'total_marks': exam.total_marks,
+            'total_marks': total_marks,
             'exam_expired': exam_expired,
             'allowed_batch': exam.allowed_batch or 'All Batches',
             'total_students': len(all_students),
@@ -233,12 +302,24 @@ def teacher_student_performance(request):
         })
     
     else:
-        teacher_exams = Exam.objects.filter(created_by=profile)
+        teacher_exams = list(Exam.objects.filter(created_by=profile))
         
-        students = UserProfile.objects.filter(
+        students_query = UserProfile.objects.filter(
             role='student',
             department=profile.department
-        ).select_related('user')
+        )
+        students = list(students_query.select_related('user'))
+        
+        # (student_id, exam_id) -> (score, is_submitted)
+        attempt_index = {
+            (student_id, exam_id): (score, is_submitted)
+            for student_id, exam_id, score, is_submitted in ExamAttempt.objects.filter(
+                exam__in=[exam.id for exam in teacher_exams],
+                student__in=students_query
+            ).values_list('student_id', 'exam_id', 'score', 'is_submitted')
+        }
+        
+        eligible_exams = eligible_exams_by_group(students, teacher_exams)
         
         student_data = []
         for student in students:
@@ -250,42 +331,29 @@ def teacher_student_performance(request):
             total_possible = 0
             
             exam_details = []
-            eligible_exam_count = 0  
+            exams_for_student = eligible_exams[(student.department, student.batch)]
             
-            for exam in teacher_exams:
-                if not should_student_take_exam(student, exam):
-                    continue  
-                
-                eligible_exam_count += 1
+            for exam in exams_for_student:
                 exam_expired = exam.end_time < now
+                total_marks = exam.total_marks
+                attempt = attempt_index.get((student.id, exam.id))
                 
-                try:
-                    attempt = ExamAttempt.objects.get(student=student, exam=exam)
+                if attempt is not None:
+                    score, is_submitted = attempt
                     
-                    if attempt.is_submitted:
+                    if is_submitted:
                         status = 'submitted'
                         submitted += 1
-                        total_score += attempt.score
-                        total_possible += exam.total_marks
+                        total_score += score
+                        total_possible += total_marks
                     elif exam_expired:
                         status = 'absent'
                         absent += 1
                     else:
                         status = 'in_progress'
                     
-                    percentage = (attempt.score / exam.total_marks * 100) if exam.total_marks > 0 else 0
-                    
-                    exam_details.append({
-                        'exam_id': exam.id,
-                        'exam_title': exam.title,
-                        'exam_batch': exam.allowed_batch or 'All Batches',
-                        'score': attempt.score,
-                        'total_marks': exam.total_marks,
-                        'percentage': round(percentage, 2),
-                        'status': status
-                    })
-                    
-                except ExamAttempt.DoesNotExist:
+                    percentage = (score / total_marks * 100) if total_marks > 0 else 0
+                else:
                     if exam_expired:
                         status = 'absent'
                         absent += 1
@@ -293,15 +361,18 @@ def teacher_student_performance(request):
                         status = 'not_attempted'
                         not_attempted += 1
                     
-                    exam_details.append({
-                        'exam_id': exam.id,
-                        'exam_title': exam.title,
-                        'exam_batch': exam.allowed_batch or 'All Batches',
-                        'score': 0,
-                        'total_marks': exam.total_marks,
-                        'percentage': 0,
-                        'status': status
-                    })
+                    score = 0
+                    percentage = 0
+                
+                exam_details.append({
+                    'exam_id': exam.id,
+                    'exam_title': exam.title,
+                    'exam_batch': exam.allowed_batch or 'All Batches',
+                    'score': score,
+                    'total_marks': total_marks,
+                    'percentage': round(percentage, 2),
+                    'status': status
+                })
             
             avg_score = (total_score / submitted) if submitted > 0 else 0
             avg_percentage = (total_score / total_possible * 100) if total_possible > 0 else 0
@@ -310,7 +381,7 @@ def teacher_student_performance(request):
                 'student_id': student.id,
                 'student_name': student.user.username,
                 'batch': student.batch,
-                'total_exams': eligible_exam_count,  # Only count eligible exams
+                'total_exams': len(exams_for_student),  # Only count eligible exams
                 'submitted': submitted,
                 'absent': absent,
                 'not_attempted': not_attempted,
@@ -322,7 +393,7 @@ def teacher_student_performance(request):
         return Response({
             'department': profile.department,
             'total_students': len(student_data),
-            'total_exams': teacher_exams.count(),
+            'total_exams': len(teacher_exams),
             'students': student_data
         })
 
@@ -350,6 +421,8 @@ def teacher_update_exam(request, exam_id):
         exam.duration = request.data['duration']
     if 'allowed_batch' in request.data:
         exam.allowed_batch = request.data['allowed_batch']
+    if 'shuffle_questions' in request.data:
+        exam.shuffle_questions = parse_flag(request.data['shuffle_questions'])
     if 'start_time' in request.data:
         try:
             exam.start_time = timezone.datetime.fromisoformat(
@@ -369,6 +442,7 @@ def teacher_update_exam(request, exam_id):
         return Response({"error": "end_time must be after start_time"}, status=400)
     
     exam.save()
+    logger.info("Teacher updated exam %s", exam.id, extra={'exam_id': exam.id})
     return Response({"message": "Exam updated successfully"})
 
 
@@ -391,4 +465,5 @@ def teacher_delete_exam(request, exam_id):
         return Response({"error": "Exam not found or you don't have permission"}, status=404)
     
     exam.delete()
+    logger.info("Teacher %s deleted exam %s", profile.id, exam_id, extra={'exam_id': exam_id, 'teacher_id': profile.id})
     return Response({"message": "Exam deleted successfully"})
\ No newline at end of file
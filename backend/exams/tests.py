@@ -1,3 +1,733 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import os
+import random
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from proctoring.constants import MAX_VIOLATIONS
+from users.models import UserProfile
+from . import packing
+from .absence import mark_absent_for_closed_exams, mark_exam_absentees
+from .eligibility import submitted_exam_ids, visible_exams_query
+from .grading import AnswerKey, load_saved_answers, saved_scores, score_answers, upsert_answers
+from .models import Exam, Question, ExamAttempt
+from .question_io import FIELDS, import_questions
+
+
+class TeacherExamListQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        user = User.objects.create_user(username='teacher', password='pass')
+        self.teacher = UserProfile.objects.create(user=user, role='teacher', department='CS')
+
+        user = User.objects.create_user(username='student', password='pass')
+        self.student = UserProfile.objects.create(
+            user=user, role='student', department='CS', batch='2024'
+        )
+
+    def create_exams(self, count):
+        now = timezone.now()
+        for i in range(count):
+            exam = Exam.objects.create(
+                title=f'Exam {i}',
+                duration=30,
+                department='CS',
+                start_time=now - timezone.timedelta(hours=1),
+                end_time=now + timezone.timedelta(hours=1),
+                created_by=self.teacher,
+            )
+            for j in range(3):
+                Question.objects.create(
+                    exam=exam,
+                    question_text=f'Question {j}',
+                    option_a='a', option_b='b', option_c='c', option_d='d',
+                    correct_option='A',
+                )
+            ExamAttempt.objects.create(student=self.student, exam=exam, is_submitted=True)
+
+    def get_exam_list(self, **params):
+        return self.client.get('/api/teacher/exams/', {'user_id': self.teacher.user_id, **params})
+
+    def test_query_count_is_constant(self):
+        self.create_exams(1)
+        with self.assertNumQueries(2):
+            response = self.get_exam_list()
+        self.assertEqual(len(response.json()['results']), 1)
+
+        self.create_exams(10)
+        with self.assertNumQueries(2):
+            response = self.get_exam_list()
+        self.assertEqual(len(response.json()['results']), 11)
+
+        with self.assertNumQueries(2):
+            response = self.get_exam_list(page_size=4, cursor=response.json()['next'] or '')
+        self.assertEqual(len(response.json()['results']), 4)
+
+    def test_cursor_pages_cover_every_exam_once(self):
+        # Identical start times: the id tie-breaker has to keep pages apart
+        now = timezone.now()
+        Exam.objects.bulk_create([
+            Exam(title=f'Exam {i}', duration=30, department='CS', start_time=now,
+                 end_time=now + timezone.timedelta(hours=1), created_by=self.teacher)
+            for i in range(7)
+        ])
+
+        ids = []
+        cursor = ''
+        while True:
+            page = self.get_exam_list(page_size=3, cursor=cursor).json()
+            ids += [exam['id'] for exam in page['results']]
+            cursor = page['next']
+            if not cursor:
+                break
+
+        self.assertEqual(ids, sorted(Exam.objects.values_list('id', flat=True), reverse=True))
+        self.assertEqual(self.get_exam_list(cursor='garbage').status_code, 400)
+
+    def test_status_filter(self):
+        now = timezone.now()
+        for title, start in [('past', -3), ('current', -1), ('future', 2)]:
+            Exam.objects.create(
+                title=title, duration=30, department='CS', created_by=self.teacher,
+                start_time=now + timezone.timedelta(hours=start),
+                end_time=now + timezone.timedelta(hours=start + 2),
+            )
+
+        for status, title in [('expired', 'past'), ('active', 'current'), ('upcoming', 'future')]:
+            results = self.get_exam_list(status=status).json()['results']
+            self.assertEqual([exam['title'] for exam in results], [title])
+        self.assertEqual(self.get_exam_list(status='soon').status_code, 400)
+
+    def test_counts_match_related_rows(self):
+        self.create_exams(2)
+        exam = Exam.objects.first()
+        user = User.objects.create_user(username='other', password='pass')
+        other = UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+        ExamAttempt.objects.create(student=other, exam=exam, is_submitted=False)
+
+        data = {row['id']: row for row in self.get_exam_list().json()['results']}
+
+        self.assertEqual(data[exam.id]['question_count'], 3)
+        self.assertEqual(data[exam.id]['total_marks'], 3)
+        self.assertEqual(data[exam.id]['attempts'], 1)
+
+    def test_only_own_submits_invalidate_the_cached_list(self):
+        self.create_exams(1)
+        exam = Exam.objects.get()
+        user = User.objects.create_user(username='other-teacher', password='pass')
+        other_exam = Exam.objects.create(
+            title='Other', duration=30, department='CS', start_time=exam.start_time, end_time=exam.end_time,
+            created_by=UserProfile.objects.create(user=user, role='teacher', department='CS'),
+        )
+        self.get_exam_list()
+
+        user = User.objects.create_user(username='other-student', password='pass')
+        other = UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+        ExamAttempt.objects.create(student=other, exam=other_exam, is_submitted=True)
+        attempt = ExamAttempt.objects.create(student=other, exam=exam)
+        # Only the profile lookup: the cached page still stands
+        with self.assertNumQueries(1):
+            self.get_exam_list()
+
+        attempt.is_submitted = True
+        attempt.save()
+        with self.assertNumQueries(2):
+            response = self.get_exam_list()
+        self.assertEqual(response.json()['results'][0]['attempts'], 2)
+
+    def test_deleting_an_exam_bumps_versions_once(self):
+        self.create_exams(1)
+        with mock.patch('exams.signals.bump_version') as bump_version, \
+                mock.patch('exams.signals.bump_attempt_versions') as bump_attempt_versions:
+            Exam.objects.get().delete()
+        bump_version.assert_called_once_with('exam')
+        bump_attempt_versions.assert_not_called()
+
+
+class ExamAttemptTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        user = User.objects.create_user(username='student', password='pass')
+        self.student = UserProfile.objects.create(
+            user=user, role='student', department='CS', batch='2024'
+        )
+
+        now = timezone.now()
+        self.exam = Exam.objects.create(
+            title='Exam', duration=1, department='CS',
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+        )
+        self.question, self.other_question = [
+            Question.objects.create(
+                exam=self.exam, question_text=f'Question {i}',
+                option_a='a', option_b='b', option_c='c', option_d='d',
+                correct_option='A',
+            )
+            for i in range(2)
+        ]
+
+    def post(self, action, **data):
+        return self.client.post(
+            f'/api/exams/{self.exam.id}/{action}/',
+            {'user_id': self.student.user_id, **data},
+            content_type='application/json'
+        )
+
+    def start(self, minutes_ago):
+        """Start the attempt as if it had been started minutes_ago"""
+        self.post('start')
+        attempt = ExamAttempt.objects.get(exam=self.exam)
+        start = timezone.now() - timezone.timedelta(minutes=minutes_ago)
+        ExamAttempt.objects.filter(id=attempt.id).update(
+            start_time=start, deadline=start + timezone.timedelta(minutes=self.exam.duration)
+        )
+        return attempt
+
+    def submit_correct_answer(self):
+        return self.post('submit', answers=[{'question_id': self.question.id, 'selected_option': 'A'}])
+
+    def test_start_returns_deadline(self):
+        data = self.post('start').json()
+        attempt = ExamAttempt.objects.get(exam=self.exam)
+        self.assertEqual(data['deadline'], attempt.deadline.isoformat().replace('+00:00', 'Z'))
+        self.assertIn(data['remaining_seconds'], (59, 60))
+
+    def test_submit_within_grace_keeps_answers(self):
+        attempt = self.start(minutes_ago=1.25)
+        self.assertEqual(self.submit_correct_answer().json()['score'], 1)
+
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.is_submitted), ('submitted', True))
+
+    def test_submit_after_grace_grades_saved_answers(self):
+        attempt = self.start(minutes_ago=2)
+        data = self.submit_correct_answer().json()
+        self.assertEqual(data['message'], "Time over. Exam auto-submitted.")
+        self.assertEqual(data['score'], 0)
+        self.assertTrue(ExamAttempt.objects.get(id=attempt.id).is_submitted)
+
+    def test_editing_duration_moves_open_deadlines(self):
+        attempt = self.start(minutes_ago=2)
+        self.exam.duration = 30
+        self.exam.save()
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.deadline, attempt.start_time + timezone.timedelta(minutes=30))
+
+        # Capped at the exam's end
+        self.exam.end_time = timezone.now() + timezone.timedelta(minutes=5)
+        self.exam.save()
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.deadline, self.exam.end_time)
+
+        self.assertEqual(self.submit_correct_answer().json()['score'], 1)
+
+    def test_absence_job_leaves_just_closed_exams_alone(self):
+        attempt = self.start(minutes_ago=0.5)
+        upsert_answers(attempt.id, {self.question.id: 'A'})
+        ended = timezone.now() - timezone.timedelta(seconds=5)
+        Exam.objects.filter(id=self.exam.id).update(end_time=ended)
+        ExamAttempt.objects.filter(id=attempt.id).update(deadline=ended)
+
+        self.assertEqual(mark_absent_for_closed_exams(), [])
+        self.assertFalse(ExamAttempt.objects.get(id=attempt.id).is_submitted)
+
+        ended -= timezone.timedelta(minutes=1)
+        Exam.objects.filter(id=self.exam.id).update(end_time=ended)
+        ExamAttempt.objects.filter(id=attempt.id).update(deadline=ended)
+        mark_absent_for_closed_exams()
+
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.score, attempt.is_submitted), ('submitted', 1, True))
+
+    def test_absence_counts_only_inserted_attempts(self):
+        user = User.objects.create_user(username='absent', password='pass')
+        UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+        Exam.objects.filter(id=self.exam.id).update(end_time=timezone.now() - timezone.timedelta(minutes=5))
+        self.exam.refresh_from_db()
+
+        bulk_create = ExamAttempt.objects.bulk_create
+
+        def start_first(attempts, **kwargs):
+            # The student starts between the missing-student query and the insert
+            ExamAttempt.objects.create(student=self.student, exam=self.exam)
+            return bulk_create(attempts, **kwargs)
+
+        with mock.patch.object(ExamAttempt.objects, 'bulk_create', side_effect=start_first):
+            self.assertEqual(mark_exam_absentees(self.exam), (1, 1))
+        self.assertEqual(ExamAttempt.objects.filter(exam=self.exam, status='absent').count(), 1)
+
+        Exam.objects.filter(id=self.exam.id).update(end_time=timezone.now() - timezone.timedelta(hours=2))
+        response = self.client.post('/api/exams/mark-absent/', {'full': True}, content_type='application/json')
+        self.assertEqual(response.json()['marked_count'], 0)
+        self.assertEqual(len(response.json()['exams']), 1)
+
+
+    def test_stale_autosave_is_ignored_and_submit_merges(self):
+        self.post('start')
+        saved = self.post('autosave', seq=2, answers=[{'question_id': self.question.id, 'selected_option': 'A'}])
+        self.assertFalse(saved.json()['stale'])
+        stale = self.post('autosave', seq=1, answers=[{'question_id': self.question.id, 'selected_option': 'B'}])
+        self.assertTrue(stale.json()['stale'])
+        self.assertEqual(stale.json()['latest_seq'], 2)
+
+        # Only the answer changed since the autosave is sent
+        data = self.post('submit', answers=[{'question_id': self.other_question.id, 'selected_option': 'A'}]).json()
+        self.assertEqual(data['score'], 2)
+        self.assertEqual(self.post('autosave', seq=3, answers=[]).status_code, 400)
+
+    def test_violation_limit_grades_saved_answers(self):
+        attempt = self.start(minutes_ago=0)
+        upsert_answers(attempt.id, {self.question.id: 'A'})
+
+        for _ in range(MAX_VIOLATIONS):
+            response = self.client.post('/api/proctor/log/', {
+                'user_id': self.student.user_id, 'exam_id': self.exam.id, 'event': 'tab_switch'
+            })
+        self.assertTrue(response.json()['auto_submitted'])
+
+        attempt.refresh_from_db()
+        self.assertEqual((attempt.status, attempt.score, attempt.is_submitted), ('submitted', 1, True))
+
+    @override_settings(DEBUG=True)
+    async def test_async_endpoints_need_no_adapted_middleware(self):
+        # With DEBUG on, Django logs "Asynchronous handler adapted for
+        # middleware ..." when a sync-only middleware needs a thread
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            started = await AsyncClient().post(
+                f'/api/async/exams/{self.exam.id}/start/',
+                {'user_id': self.student.user_id}, content_type='application/json'
+            )
+            self.assertEqual(started.status_code, 200)
+            self.assertIn(started.json()['remaining_seconds'], (59, 60))
+
+            submitted = await AsyncClient().post(
+                f'/api/async/exams/{self.exam.id}/submit/',
+                {'user_id': self.student.user_id, 'answers': [
+                    {'question_id': self.question.id, 'selected_option': 'A'}
+                ]},
+                content_type='application/json'
+            )
+        self.assertEqual(submitted.json(), {"message": "Exam submitted", "score": 1})
+
+
+class QuestionPaperTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='student', password='pass')
+        self.student = UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+
+        now = timezone.now()
+        self.exam = Exam.objects.create(
+            title='Exam', duration=30, department='CS',
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+        )
+        self.question = Question.objects.create(
+            exam=self.exam, question_text='Question',
+            option_a='a', option_b='b', option_c='c', option_d='d', correct_option='A',
+        )
+
+    def get_paper(self, **headers):
+        return self.client.get(
+            f'/api/exams/{self.exam.id}/questions/', {'user_id': self.student.user_id}, headers=headers
+        )
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.get_paper()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.get_paper(If_None_Match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+        # A proxy may weaken it; If-None-Match compares weakly
+        self.assertEqual(self.get_paper(If_None_Match=f'W/{etag}').status_code, 304)
+
+    def test_content_change_gets_a_new_etag(self):
+        etag = self.get_paper()['ETag']
+
+        self.question.question_text = 'Reworded'
+        self.question.save()
+
+        response = self.get_paper(If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['question_text'], 'Reworded')
+
+    @override_settings(QUESTION_PAPER_GZIP=True)
+    def test_gzipped_paper_has_its_own_etag(self):
+        plain = self.get_paper()
+        response = self.get_paper(Accept_Encoding='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertNotEqual(response['ETag'], plain['ETag'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        self.assertEqual(self.get_paper(Accept_Encoding='gzip', If_None_Match=response['ETag']).status_code, 304)
+        # The gzip ETag doesn't validate the identity encoding
+        self.assertEqual(self.get_paper(If_None_Match=response['ETag']).status_code, 200)
+
+class QuestionImportExportTests(TestCase):
+    HEADER = 'question_text,option_a,option_b,option_c,option_d,correct_option\n'
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.exam = Exam.objects.create(
+            title='Exam', duration=30, department='CS',
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+        )
+
+    def import_csv(self, body, **data):
+        upload = SimpleUploadedFile('questions.csv', (self.HEADER + body).encode(), content_type='text/csv')
+        return self.client.post(f'/api/admin/exams/{self.exam.id}/questions/import/', {'file': upload, **data})
+
+    def export(self, fmt):
+        response = self.client.get(f'/api/admin/exams/{self.exam.id}/questions/export/', {'file_format': fmt})
+        return b''.join(response.streaming_content).decode()
+
+    def test_invalid_rows_roll_back_the_whole_import(self):
+        response = self.import_csv(
+            'Two plus two?,3,4,5,6,B\n'
+            'No answer,a,b,c,d,\n'
+            'Bad answer,a,b,c,d,E\n'
+            f'Long option,{"x" * 201},b,c,d,A\n'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        data = response.json()
+        self.assertEqual((data['imported'], data['error_count']), (0, 3))
+        self.assertEqual(data['errors'], [
+            {'row': 3, 'errors': ["correct_option is required"]},
+            {'row': 4, 'errors': ["correct_option must be A, B, C, or D"]},
+            {'row': 5, 'errors': ["option_a is longer than 200 characters"]},
+        ])
+
+        self.exam.refresh_from_db()
+        self.assertFalse(Question.objects.exists())
+        self.assertEqual((self.exam.question_count, self.exam.content_version), (0, 0))
+
+        # Chunks already inserted before the bad row are rolled back too
+        valid = dict(zip(FIELDS, ['Q', 'a', 'b', 'c', 'd', 'A']))
+        rows = enumerate([valid, valid, {**valid, 'correct_option': 'E'}], start=2)
+        report = import_questions(self.exam, rows, chunk_size=1)
+        self.assertEqual((report['imported'], report['error_count']), (0, 1))
+        self.exam.refresh_from_db()
+        self.assertFalse(Question.objects.exists())
+        self.assertEqual(self.exam.slot_count, 0)
+
+    def test_skip_invalid_keeps_valid_rows_and_counts_them(self):
+        response = self.import_csv(
+            'Two plus two?,3,4,5,6,b\n'
+            'Bad answer,a,b,c,d,E\n'
+            'Capital of France?,Paris,Rome,Oslo,Bern,A\n',
+            skip_invalid='true',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['imported'], response.json()['error_count']), (2, 1))
+
+        self.exam.refresh_from_db()
+        self.assertEqual(self.exam.question_count, 2)
+        self.assertEqual(self.exam.content_version, 1)
+        slots = list(Question.objects.values_list('slot', flat=True))
+        self.assertEqual(sorted(slots), [0, 1])
+        self.assertEqual(sorted(Question.objects.values_list('correct_option', flat=True)), ['A', 'B'])
+
+    def test_dry_run_saves_nothing(self):
+        response = self.import_csv('Two plus two?,3,4,5,6,B\n', dry_run='1')
+
+        self.assertEqual((response.status_code, response.json()['imported']), (200, 1))
+        self.exam.refresh_from_db()
+        self.assertFalse(Question.objects.exists())
+        self.assertEqual((self.exam.question_count, self.exam.content_version), (0, 0))
+
+    def test_export_round_trips_the_import(self):
+        rows = 'Two plus two?,3,4,5,6,B\n"Comma, quoted",a,b,c,d,D\n'
+        self.assertEqual(self.import_csv(rows).status_code, 201)
+
+        self.assertEqual(self.export('csv').replace('\r\n', '\n'), self.HEADER + rows)
+        lines = self.export('jsonl').splitlines()
+        self.assertEqual(json.loads(lines[1])['question_text'], 'Comma, quoted')
+        self.assertEqual(len(lines), 2)
+
+class ShuffledExamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='student', password='pass')
+        self.student = UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+
+        now = timezone.now()
+        self.exam = Exam.objects.create(
+            title='Exam', duration=30, department='CS', shuffle_questions=True,
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+        )
+        self.questions = [
+            Question.objects.create(
+                exam=self.exam, question_text=f'Question {i}',
+                option_a=f'{i}a', option_b=f'{i}b', option_c=f'{i}c', option_d=f'{i}d',
+                correct_option='ABCD'[i % 4],
+            )
+            for i in range(8)
+        ]
+
+    def test_paper_is_a_stable_permutation(self):
+        url = f'/api/exams/{self.exam.id}/questions/'
+        paper = self.client.get(url, {'user_id': self.student.user_id}).json()
+        self.assertEqual(paper, self.client.get(url, {'user_id': self.student.user_id}).json())
+
+        self.assertNotEqual([q['id'] for q in paper], [q.id for q in self.questions])
+        self.assertEqual(sorted(q['id'] for q in paper), [q.id for q in self.questions])
+        for shown in paper:
+            question = next(q for q in self.questions if q.id == shown['id'])
+            self.assertEqual(
+                sorted(shown[f'option_{letter}'] for letter in 'abcd'),
+                [question.option_a, question.option_b, question.option_c, question.option_d]
+            )
+
+    def test_answers_in_shown_letters_are_graded_against_the_base_paper(self):
+        paper = self.client.get(f'/api/exams/{self.exam.id}/questions/', {'user_id': self.student.user_id}).json()
+        answers = []
+        for shown in paper:
+            question = next(q for q in self.questions if q.id == shown['id'])
+            correct_text = getattr(question, f'option_{question.correct_option.lower()}')
+            letter = next(letter for letter in 'ABCD' if shown[f'option_{letter.lower()}'] == correct_text)
+            # Every other question answered with a wrong letter
+            if len(answers) % 2:
+                letter = next(other for other in 'ABCD' if other != letter)
+            answers.append({'question_id': shown['id'], 'selected_option': letter})
+
+        self.client.post(
+            f'/api/exams/{self.exam.id}/start/', {'user_id': self.student.user_id}, content_type='application/json'
+        )
+        data = self.client.post(
+            f'/api/exams/{self.exam.id}/submit/',
+            {'user_id': self.student.user_id, 'answers': answers},
+            content_type='application/json'
+        ).json()
+        self.assertEqual(data['score'], 4)
+
+
+class PackingTests(SimpleTestCase):
+    def random_selections(self, rng, slots):
+        return {slot: rng.choice('ABCD') for slot in rng.sample(range(slots), rng.randint(0, slots))}
+
+    def test_round_trip(self):
+        rng = random.Random(1)
+        self.assertEqual(packing.decode(packing.encode({})), {})
+        for slots in (1, 2, 3, 8, 100, 301):
+            selections = self.random_selections(rng, slots)
+            packed = packing.encode(selections)
+            self.assertEqual(packing.decode(packed), selections)
+            self.assertLessEqual(len(packed), packing.packed_size(slots))
+
+    def test_merge_overwrites_and_keeps_other_slots(self):
+        packed = packing.encode({0: 'A', 5: 'D', 40: 'B'})
+        self.assertEqual(
+            packing.decode(packing.merge(packed, {5: 'A', 41: 'C'})),
+            {0: 'A', 5: 'A', 40: 'B', 41: 'C'}
+        )
+
+    def test_count_matches_agrees_with_row_grading(self):
+        rng = random.Random(2)
+        for _ in range(200):
+            slots = rng.randint(1, 120)
+            # Question ids differ from slots, and some slots belong to deleted questions
+            rows = [
+                (1000 + slot * 7, rng.choice('ABCD'), slot)
+                for slot in range(slots) if rng.random() > 0.2
+            ]
+            answer_key = AnswerKey(rows, packed=True)
+            answers = self.random_selections(rng, slots)
+            by_question = {question_id: answers[slot] for question_id, _, slot in rows if slot in answers}
+
+            self.assertEqual(
+                packing.count_matches(packing.encode(answers), answer_key.packed),
+                score_answers(answer_key, by_question)
+            )
+
+    def test_deleted_question_slots_never_match(self):
+        answer_key = AnswerKey([(10, 'A', 0), (12, 'C', 2)], packed=True)
+        # Slot 1 held a question whose answer was A before it was deleted
+        self.assertEqual(packing.count_matches(packing.encode({0: 'A', 1: 'A', 2: 'C'}), answer_key.packed), 2)
+        self.assertEqual(packing.count_matches(b'', answer_key.packed), 0)
+
+
+class PackedStorageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='student', password='pass')
+        self.student = UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+
+        now = timezone.now()
+        self.exam = Exam.objects.create(
+            title='Exam', duration=30, department='CS',
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+        )
+        self.questions = [
+            Question.objects.create(
+                exam=self.exam, question_text=f'Question {i}',
+                option_a='a', option_b='b', option_c='c', option_d='d',
+                correct_option='ABCD'[i % 4],
+            )
+            for i in range(6)
+        ]
+        self.attempt = ExamAttempt.objects.create(student=self.student, exam=self.exam)
+        # Four right, one wrong, one unanswered
+        self.answers = {question.id: question.correct_option for question in self.questions[:4]}
+        self.answers[self.questions[4].id] = 'B'
+
+    def score(self):
+        self.exam.refresh_from_db()
+        attempt = ExamAttempt.objects.select_related('exam').get(id=self.attempt.id)
+        return saved_scores([attempt])[attempt.id]
+
+    def test_packed_grading_matches_rows(self):
+        upsert_answers(self.attempt.id, self.answers)
+        self.assertEqual(self.score(), 4)
+
+        call_command('pack_answers', '--delete-rows', stdout=io.StringIO())
+        self.assertFalse(load_saved_answers([self.attempt.id]))
+        with override_settings(ANSWER_STORAGE='packed'):
+            self.assertEqual(self.score(), 4)
+
+            # A deleted question's slot stays in the packed answers but no longer scores
+            self.questions[0].delete()
+            self.assertEqual(self.score(), 3)
+
+    def test_questions_without_slots_are_graded(self):
+        # bulk_create() skips the pre_save signal that assigns slots
+        unslotted, = Question.objects.bulk_create([Question(
+            exam=self.exam, question_text='Bulk', option_a='a', option_b='b', option_c='c', option_d='d',
+            correct_option='D',
+        )])
+        Exam.objects.filter(id=self.exam.id).update(content_version=F('content_version') + 1)
+        self.answers[unslotted.id] = 'D'
+        upsert_answers(self.attempt.id, self.answers)
+        self.assertEqual(self.score(), 5)
+
+        with override_settings(ANSWER_STORAGE='packed'):
+            # Loading the packed answer key gives the question a slot; nothing is packed yet
+            self.assertEqual(self.score(), 0)
+            self.assertIsNotNone(Question.objects.get(id=unslotted.id).slot)
+
+            call_command('pack_answers', '--delete-rows', stdout=io.StringIO())
+            self.assertEqual(self.score(), 5)
+
+    def test_unpack_restores_answer_rows(self):
+        upsert_answers(self.attempt.id, self.answers)
+        call_command('pack_answers', '--delete-rows', stdout=io.StringIO())
+        self.questions[5].delete()
+        call_command('pack_answers', '--unpack', stdout=io.StringIO())
+
+        self.assertEqual(load_saved_answers([self.attempt.id])[self.attempt.id], self.answers)
+        self.assertEqual(ExamAttempt.objects.get(id=self.attempt.id).packed_answers, b'')
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN the hot query shapes and check they use the composite indexes"""
+
+    def assertUsesIndex(self, queryset, *index_names):
+        """Check the plan uses one of index_names (the planner may pick either)"""
+        plan = queryset.explain()
+        self.assertTrue(any(name in plan for name in index_names), msg=plan)
+
+    def check_plans(self, student, exam):
+        # The two queries exam_list runs
+        self.assertUsesIndex(
+            visible_exams_query(student.department, student.batch), 'exam_dept_batch_window_idx'
+        )
+        # Point lookups per exam id: the (student, exam) unique index, or the
+        # covering one with is_submitted
+        submitted = submitted_exam_ids(student, [exam.id, exam.id + 1])
+        self.assertUsesIndex(submitted, 'attempt_student_submitted_idx', 'student_id_exam_id')
+        self.assertNotIn('TEMP B-TREE', submitted.explain())
+        self.assertUsesIndex(
+            ExamAttempt.objects.filter(exam=exam, is_submitted=True),
+            'attempt_exam_submitted_idx'
+        )
+        self.assertUsesIndex(
+            UserProfile.objects.filter(role='student', department='CS', batch='2024'),
+            'profile_role_dept_batch_idx'
+        )
+        self.assertUsesIndex(
+            Exam.objects.filter(created_by=student).order_by('-start_time', '-id')[:50],
+            'exam_creator_catalogue_idx'
+        )
+
+    def create_student(self, username, batch='2024'):
+        user = User.objects.create_user(username=username, password='pass')
+        return UserProfile.objects.create(user=user, role='student', department='CS', batch=batch)
+
+    def create_exam(self, title, department='CS', batch=''):
+        now = timezone.now()
+        return Exam.objects.create(
+            title=title,
+            duration=30,
+            department=department,
+            allowed_batch=batch,
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+        )
+
+    def test_hot_queries_use_composite_indexes(self):
+        student = self.create_student('student')
+        exam = self.create_exam('Exam')
+        ExamAttempt.objects.create(student=student, exam=exam, is_submitted=True)
+
+        self.check_plans(student, exam)
+
+    @unittest.skipUnless(
+        os.environ.get('EXAMPRO_SCALE_TESTS'),
+        "set EXAMPRO_SCALE_TESTS=1 to run the 1M-row query plan test"
+    )
+    def test_hot_queries_use_composite_indexes_at_scale(self):
+        # 10,000 students x 100 exams = 1,000,000 attempts
+        users = User.objects.bulk_create(
+            [User(username=f'student{i}') for i in range(10000)], batch_size=2000
+        )
+        students = UserProfile.objects.bulk_create(
+            [
+                UserProfile(user=user, role='student', department='CS', batch=str(2020 + i % 5))
+                for i, user in enumerate(users)
+            ],
+            batch_size=2000
+        )
+        exams = [
+            self.create_exam(f'Exam {i}', department=('CS', 'EE')[i % 2], batch=('', '2024')[i % 3 == 0])
+            for i in range(100)
+        ]
+
+        for exam in exams:
+            ExamAttempt.objects.bulk_create(
+                [
+                    ExamAttempt(student=student, exam=exam, is_submitted=(student.id + exam.id) % 4 != 0)
+                    for student in students
+                ],
+                batch_size=2000
+            )
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.check_plans(students[0], exams[0])
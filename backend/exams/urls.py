@@ -6,5 +6,7 @@ urlpatterns = [
     path('<int:exam_id>/questions/', exam_questions),
     path('<int:exam_id>/start/', start_exam),
     path('<int:exam_id>/submit/', submit_exam),
+    path('<int:exam_id>/autosave/', autosave_exam),
     path('<int:exam_id>/result/', exam_result),
+    path('mark-absent/', mark_absent_students),
 ]
@@ -2,12 +2,16 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q
-from proctoring.constants import MAX_VIOLATIONS
 
-from .models import Exam, Question, ExamAttempt, Answer
+from .models import Exam, ExamAttempt, parse_flag
 from users.models import UserProfile
-from .serializers import ExamSerializer, QuestionSerializer
+from .absence import mark_absent_for_closed_exams
+from .eligibility import exam_access_error, submitted_exam_ids, visible_exams
+from .papers import get_paper, paper_response
+from .shuffling import option_unshuffler
+from .grading import GradingError, apply_autosave, get_answer_key, parse_answers
+from .scheduler import attempt_deadline, submit_window_closed
+from .submission import started_exam_data, submit_answers
 
 
 
@@ -26,44 +30,32 @@ def exam_list(request):
 
     now = timezone.now()
 
-    exams = Exam.objects.filter(
-        department=profile.department,  
-    ).filter(
-        Q(allowed_batch='') | Q(allowed_batch=profile.batch)
-    )
-    
-    
-    if hasattr(Exam, 'start_time'):
-        exams = exams.filter(
-            start_time__lte=now,  
-            end_time__gte=now     
-        )
-
-    submitted_exam_ids = ExamAttempt.objects.filter(
-        student=profile,
-        is_submitted=True
-    ).values_list('exam_id', flat=True)
+    open_exams = [
+        exam for exam in visible_exams(profile.department, profile.batch)
+        if exam['start_time'] <= now <= exam['end_time']
+    ]
 
-    exams = exams.exclude(id__in=submitted_exam_ids)
+    submitted_ids = set()
+    if open_exams:
+        submitted_ids = set(submitted_exam_ids(profile, [exam['id'] for exam in open_exams]))
 
     exam_data = []
-    for exam in exams:
-        data = {
-            'id': exam.id,
-            'title': exam.title,
-            'duration': exam.duration,
-            'department': exam.department,
-            'allowed_batch': exam.allowed_batch,
-            'total_marks': exam.total_marks,
-        }
-        
-        if hasattr(exam, 'start_time') and hasattr(exam, 'end_time'):
-            data['start_time'] = exam.start_time
-            data['end_time'] = exam.end_time
-            data['is_active'] = exam.is_active
-            data['time_remaining'] = (exam.end_time - now).total_seconds() / 3600  # hours
-        
-        exam_data.append(data)
+    for exam in open_exams:
+        if exam['id'] in submitted_ids:
+            continue
+
+        exam_data.append({
+            'id': exam['id'],
+            'title': exam['title'],
+            'duration': exam['duration'],
+            'department': exam['department'],
+            'allowed_batch': exam['allowed_batch'],
+            'total_marks': exam['question_count'],
+            'start_time': exam['start_time'],
+            'end_time': exam['end_time'],
+            'is_active': True,
+            'time_remaining': (exam['end_time'] - now).total_seconds() / 3600  # hours
+        })
 
     return Response(exam_data)
 
@@ -91,22 +83,11 @@ def exam_questions(request, exam_id):
     except Exam.DoesNotExist:
         return Response({"error": "Exam not found"}, status=404)
 
-    if exam.department != user.department:  # Changed from allowed_class
-        return Response({"error": "Not allowed"}, status=403)
-    
-    if exam.allowed_batch and exam.allowed_batch != user.batch:
-        return Response({"error": "Not allowed"}, status=403)
+    denied = exam_access_error(user, exam)
+    if denied:
+        return Response({"error": denied}, status=403)
 
-    if hasattr(exam, 'start_time') and hasattr(exam, 'end_time'):
-        now = timezone.now()
-        if now < exam.start_time:
-            return Response({"error": "Exam has not started yet"}, status=403)
-        if now > exam.end_time:
-            return Response({"error": "Exam has ended"}, status=403)
-
-    questions = Question.objects.filter(exam_id=exam_id)
-    serializer = QuestionSerializer(questions, many=True)
-    return Response(serializer.data)
+    return paper_response(request, get_paper(exam), exam, user)
 
 
 
@@ -124,32 +105,20 @@ def start_exam(request, exam_id):
     except (UserProfile.DoesNotExist, Exam.DoesNotExist):
         return Response({"error": "Invalid user or exam"}, status=404)
 
-    if exam.department != profile.department:  
-        return Response({"error": "Not allowed"}, status=403)
-    
-    if exam.allowed_batch and exam.allowed_batch != profile.batch:
-        return Response({"error": "Not allowed"}, status=403)
-
-    if hasattr(exam, 'start_time') and hasattr(exam, 'end_time'):
-        now = timezone.now()
-        if now < exam.start_time:
-            return Response({"error": "Exam has not started yet"}, status=403)
-        if now > exam.end_time:
-            return Response({"error": "Exam has ended"}, status=403)
+    denied = exam_access_error(profile, exam)
+    if denied:
+        return Response({"error": denied}, status=403)
 
     attempt, created = ExamAttempt.objects.get_or_create(
         student=profile,
-        exam=exam
+        exam=exam,
+        defaults={'deadline': attempt_deadline(exam, timezone.now())}
     )
 
     if attempt.is_submitted:
         return Response({"error": "Exam already submitted"}, status=400)
 
-    return Response({
-        "message": "Exam started",
-        "start_time": attempt.start_time,
-        "duration": exam.duration
-    })
+    return Response(started_exam_data(attempt, exam))
 
 
 
@@ -161,7 +130,39 @@ def submit_exam(request, exam_id):
         return Response({"error": "user_id required"}, status=400)
 
     try:
-        attempt = ExamAttempt.objects.get(student__user_id=user_id, exam_id=exam_id)
+        attempt = ExamAttempt.objects.select_related('exam').get(student__user_id=user_id, exam_id=exam_id)
+    except ExamAttempt.DoesNotExist:
+        return Response({"error": "Exam attempt not found"}, status=404)
+
+    # Only answers changed since the last autosave need to be sent
+    data, status = submit_answers(attempt, request.data.get('answers', []))
+    return Response(data, status=status)
+
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def autosave_exam(request, exam_id):
+    """
+    Save the answers changed since the previous autosave.
+
+    Body: {"user_id", "seq", "answers": [{"question_id", "selected_option"}, ...]}
+    seq must increase with every autosave of an attempt; a request that
+    arrives after a newer one is not applied and comes back stale, with
+    the latest saved seq, for the client to resend.
+    """
+    user_id = request.data.get("user_id")
+    seq = request.data.get("seq")
+    if not user_id or seq is None:
+        return Response({"error": "user_id and seq required"}, status=400)
+
+    try:
+        seq = int(seq)
+    except (TypeError, ValueError):
+        return Response({"error": "seq must be an integer"}, status=400)
+
+    try:
+        attempt = ExamAttempt.objects.select_related('exam').get(student__user_id=user_id, exam_id=exam_id)
     except ExamAttempt.DoesNotExist:
         return Response({"error": "Exam attempt not found"}, status=404)
 
@@ -169,36 +170,31 @@ def submit_exam(request, exam_id):
         return Response({"error": "Already submitted"}, status=400)
 
     exam = attempt.exam
-    end_time = attempt.start_time + timezone.timedelta(minutes=exam.duration)
+    if submit_window_closed(attempt, timezone.now()):
+        return Response({"error": "Exam time is over"}, status=400)
 
-    if timezone.now() > end_time:
-        attempt.is_submitted = True
-        attempt.end_time = end_time
-        attempt.save()
-        return Response({"message": "Time over. Exam auto-submitted.", "score": attempt.score})
+    answers = request.data.get('answers', [])
+    if not isinstance(answers, list):
+        return Response({"error": "answers must be a list"}, status=400)
 
-    if attempt.violation_count >= MAX_VIOLATIONS:
-        attempt.is_submitted = True
-        attempt.end_time = timezone.now()
-        attempt.save()
-        return Response({"message": "Violation limit exceeded. Exam auto-submitted.", "score": attempt.score})
+    unshuffle = option_unshuffler(exam.id, attempt.student_id) if exam.shuffle_questions else None
 
-    answers = request.data.get('answers', [])
-    score = 0
-    Answer.objects.filter(attempt=attempt).delete()
+    answer_key = get_answer_key(exam)
 
-    for item in answers:
-        question = Question.objects.get(id=item['question_id'], exam=attempt.exam)
-        Answer.objects.create(attempt=attempt, question=question, selected_option=item['selected_option'])
-        if item['selected_option'] == question.correct_option:
-            score += 1
+    try:
+        selections = parse_answers(answer_key, answers, unshuffle)
+    except GradingError as e:
+        return Response({"error": str(e)}, status=400)
 
-    attempt.score = score
-    attempt.is_submitted = True
-    attempt.end_time = timezone.now()
-    attempt.save()
+    if not apply_autosave(attempt.id, answer_key, seq, selections):
+        # The client resends these answers after latest_seq
+        latest_seq = ExamAttempt.objects.values_list('autosave_seq', flat=True).get(id=attempt.id)
+        return Response({
+            "message": "Newer answers already saved", "saved": 0, "seq": seq, "stale": True,
+            "latest_seq": latest_seq
+        })
 
-    return Response({"message": "Exam submitted", "score": score})
+    return Response({"message": "Answers saved", "saved": len(selections), "seq": seq, "stale": False})
 
 
 
@@ -210,12 +206,11 @@ def exam_result(request, exam_id):
         return Response({"error": "user_id required"}, status=400)
 
     try:
-        attempt = ExamAttempt.objects.get(student__user_id=user_id, exam_id=exam_id)
+        attempt = ExamAttempt.objects.select_related('exam').get(student__user_id=user_id, exam_id=exam_id)
     except ExamAttempt.DoesNotExist:
         return Response({"error": "Result not found"}, status=404)
 
-    # Get total number of questions for this exam
-    total_questions = Question.objects.filter(exam_id=exam_id).count()
+    total_questions = attempt.exam.question_count
 
     return Response({
         "score": attempt.score,
@@ -229,47 +224,16 @@ def exam_result(request, exam_id):
 def mark_absent_students(request):
     """
     This endpoint should be called periodically (e.g., via cron job)
-    to mark students as absent for expired exams they didn't attend
+    to mark students as absent for exams that closed since the last run.
+    Pass full=true to rescan every closed exam.
     """
-    now = timezone.now()
-    
-    if hasattr(Exam, 'end_time'):
-        expired_exams = Exam.objects.filter(end_time__lt=now)
-        
-        marked_count = 0
-        
-        for exam in expired_exams:
-            students = UserProfile.objects.filter(
-                role='student',
-                department=exam.department
-            )
-            
-            if exam.allowed_batch:
-                students = students.filter(batch=exam.allowed_batch)
-            
-            for student in students:
-                attempt, created = ExamAttempt.objects.get_or_create(
-                    student=student,
-                    exam=exam,
-                    defaults={
-                        'status': 'absent',
-                        'is_submitted': True,
-                        'score': 0,
-                        'end_time': exam.end_time
-                    }
-                )
-                
-                if not created and not attempt.is_submitted:
-                    attempt.status = 'absent'
-                    attempt.is_submitted = True
-                    attempt.score = 0
-                    attempt.end_time = exam.end_time
-                    attempt.save()
-                    marked_count += 1
-        
-        return Response({
-            "message": f"Marked {marked_count} students as absent",
-            "marked_count": marked_count
-        })
-    else:
-        return Response({"message": "Scheduling not enabled"})
\ No newline at end of file
+    full = parse_flag(request.data.get('full'))
+    report = mark_absent_for_closed_exams(full=full)
+    marked_count = sum(row['created'] for row in report)
+
+    return Response({
+        "message": f"Marked {marked_count} students as absent",
+        "marked_count": marked_count,
+        "closed_count": sum(row['closed'] for row in report),
+        "exams": report
+    })
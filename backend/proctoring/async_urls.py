@@ -0,0 +1,7 @@
+from django.urls import path
+from .async_views import log_event, get_violations
+
+urlpatterns = [
+    path('log/', log_event, name='async_log_event'),
+    path('violations/', get_violations, name='async_get_violations'),
+]
@@ -0,0 +1,68 @@
+# proctoring/async_views.py
+"""Async versions of log_event and get_violations, mounted under /api/async/proctor/"""
+from asgiref.sync import sync_to_async
+from django.db.models import F
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from exams.async_views import request_json
+from exams.models import ExamAttempt
+from .buffer import log_buffer
+from .constants import MAX_VIOLATIONS
+from .models import ProctorLog
+from .violations import close_for_violations, logged_event_data, parse_event, unlogged_event_data
+
+
+@csrf_exempt
+@require_POST
+async def log_event(request):
+    data = request_json(request)
+    if data is None:
+        return JsonResponse({"error": "Request body must be a JSON object"}, status=400)
+
+    try:
+        user_id, exam_id, event = parse_event(data)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    attempts = ExamAttempt.objects.filter(student__user_id=user_id, exam_id=exam_id)
+
+    # Bump the counter in the database; only open attempts take new violations
+    if not await attempts.filter(is_submitted=False).aupdate(violation_count=F('violation_count') + 1):
+        data, status = await sync_to_async(unlogged_event_data)(user_id, attempts)
+        return JsonResponse(data, status=status)
+
+    attempt_id, violation_count = await attempts.values_list('id', 'violation_count').aget()
+
+    # A full buffer flushes inline, which needs a thread
+    await sync_to_async(log_buffer.add)(ProctorLog(student_id=user_id, exam_id=exam_id, event=event))
+
+    if violation_count >= MAX_VIOLATIONS:
+        await sync_to_async(close_for_violations)(attempt_id, violation_count)
+        await sync_to_async(log_buffer.flush)()
+
+    return JsonResponse(logged_event_data(violation_count))
+
+
+@require_GET
+async def get_violations(request):
+    """Get violation count for a specific exam attempt"""
+    user_id = request.GET.get('user_id')
+    exam_id = request.GET.get('exam_id')
+
+    if not user_id or not exam_id:
+        return JsonResponse({"error": "user_id and exam_id required"}, status=400)
+
+    try:
+        violation_count = await ExamAttempt.objects.values_list('violation_count', flat=True).aget(
+            student__user_id=user_id, exam_id=exam_id
+        )
+    except (ExamAttempt.DoesNotExist, ValueError):
+        return JsonResponse({"error": "Exam attempt not found"}, status=404)
+
+    return JsonResponse({
+        "violations": violation_count,
+        "remaining": MAX_VIOLATIONS - violation_count,
+        "max_violations": MAX_VIOLATIONS
+    })
@@ -0,0 +1,85 @@
+# proctoring/buffer.py
+import atexit
+import logging
+import threading
+
+from django.db import DatabaseError, IntegrityError, connections
+
+from .constants import LOG_BUFFER_SIZE, LOG_FLUSH_INTERVAL
+from .models import ProctorLog
+
+logger = logging.getLogger(__name__)
+
+
+class ProctorLogBuffer:
+    """
+    In-process buffer of ProctorLog rows.
+
+    Rows are written with a single bulk_create once max_size events are
+    queued, or max_age seconds after the first event of a batch arrives,
+    whichever comes first.
+    """
+
+    def __init__(self, max_size=LOG_BUFFER_SIZE, max_age=LOG_FLUSH_INTERVAL):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._logs = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, log):
+        with self._lock:
+            self._logs.append(log)
+            full = len(self._logs) >= self.max_size
+            if not full and self._timer is None:
+                self._schedule()
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered row now; returns the number written"""
+        with self._lock:
+            logs, self._logs = self._logs, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not logs:
+            return 0
+
+        try:
+            ProctorLog.objects.bulk_create(logs, batch_size=500)
+        except IntegrityError:
+            # e.g. the exam was deleted while its events were queued
+            logger.exception("Dropping %d proctor log rows that failed to insert", len(logs))
+            return 0
+        except DatabaseError:
+            logger.exception("Proctor log flush failed, retrying %d rows later", len(logs))
+            with self._lock:
+                self._logs[:0] = logs
+                if self._timer is None:
+                    self._schedule()
+            return 0
+
+        return len(logs)
+
+    def pending(self):
+        with self._lock:
+            return len(self._logs)
+
+    def _schedule(self):
+        self._timer = threading.Timer(self.max_age, self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread opened its own connection; don't leak it
+            connections.close_all()
+
+
+log_buffer = ProctorLogBuffer()
+atexit.register(log_buffer.flush)
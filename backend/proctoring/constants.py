@@ -12,4 +12,12 @@ EVENT_TYPES = {
     'multiple_faces': 'Multiple faces detected in webcam',
     'no_face': 'No face detected in webcam',
     'suspicious_movement': 'Suspicious movement detected',
-}
\ No newline at end of file
+}
+
+# Proctor log write buffering: events are flushed with one bulk insert once
+# this many are queued, or this many seconds after the first queued event
+LOG_BUFFER_SIZE = 200
+LOG_FLUSH_INTERVAL = 2.0
+
+# Largest number of events accepted by one /log/batch/ request
+MAX_BATCH_EVENTS = 100
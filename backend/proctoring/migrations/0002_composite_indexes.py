@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_composite_indexes'),
+        ('proctoring', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proctorlog',
+            index=models.Index(fields=['exam', 'student', 'timestamp'], name='proctorlog_exam_student_ts_idx'),
+        ),
+    ]
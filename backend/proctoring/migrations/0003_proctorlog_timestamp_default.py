@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proctoring', '0002_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='proctorlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -2,10 +2,17 @@ from django.db import models
 
 # Create your models here.
 from django.contrib.auth.models import User
+from django.utils import timezone
 from exams.models import Exam
 
 class ProctorLog(models.Model):
     student = models.ForeignKey(User, on_delete=models.CASCADE)
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE)
     event = models.CharField(max_length=100)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event is received, not when the buffered row is written
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['exam', 'student', 'timestamp'], name='proctorlog_exam_student_ts_idx'),
+        ]
@@ -1,3 +1,104 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from exams.models import Exam, ExamAttempt
+from users.models import UserProfile
+from .buffer import log_buffer
+from .constants import MAX_VIOLATIONS
+from .models import ProctorLog
+
+
+class ProctorLogTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Flush only when the tests say so, never from the timer thread
+        patcher = mock.patch.object(log_buffer, 'max_age', 3600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(log_buffer.flush)
+
+        user = User.objects.create_user(username='student', password='pass')
+        self.student = UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+
+        now = timezone.now()
+        self.exam = Exam.objects.create(
+            title='Exam', duration=60, department='CS',
+            start_time=now - timezone.timedelta(hours=1),
+            end_time=now + timezone.timedelta(hours=1),
+        )
+        self.attempt = ExamAttempt.objects.create(
+            student=self.student, exam=self.exam, deadline=now + timezone.timedelta(hours=1)
+        )
+
+    def log(self, event='tab_switch'):
+        return self.client.post('/api/proctor/log/', {
+            'user_id': self.student.user_id, 'exam_id': self.exam.id, 'event': event
+        }).json()
+
+    def log_batch(self, events):
+        return self.client.post('/api/proctor/log/batch/', {
+            'user_id': self.student.user_id, 'exam_id': self.exam.id, 'events': events
+        }, content_type='application/json').json()
+
+    def test_threshold_event_auto_submits_and_flushes(self):
+        for count in range(1, MAX_VIOLATIONS):
+            data = self.log()
+            self.assertEqual(
+                (data['violations'], data['remaining'], data['auto_submitted']),
+                (count, MAX_VIOLATIONS - count, False)
+            )
+        # Buffered, not written yet
+        self.assertEqual(ProctorLog.objects.count(), 0)
+
+        data = self.log()
+        self.assertEqual((data['violations'], data['auto_submitted']), (MAX_VIOLATIONS, True))
+        self.assertEqual(ProctorLog.objects.count(), MAX_VIOLATIONS)
+        self.attempt.refresh_from_db()
+        self.assertEqual((self.attempt.is_submitted, self.attempt.status), (True, 'submitted'))
+
+        self.assertEqual(self.log(), {"message": "Exam already submitted"})
+        self.assertEqual(log_buffer.pending(), 0)
+
+    def test_batch_stops_at_the_limit(self):
+        data = self.log_batch([{'event': f'event {i}'} for i in range(MAX_VIOLATIONS + 2)])
+
+        self.assertEqual((data['accepted'], data['ignored']), (MAX_VIOLATIONS, 2))
+        self.assertEqual((data['violations'], data['remaining']), (MAX_VIOLATIONS, 0))
+        self.assertTrue(data['auto_submitted'] and data['submitted'])
+        self.assertEqual(
+            list(ProctorLog.objects.order_by('id').values_list('event', flat=True)),
+            [f'event {i}' for i in range(MAX_VIOLATIONS)]
+        )
+        self.assertTrue(ExamAttempt.objects.get(id=self.attempt.id).is_submitted)
+
+    def test_batch_clamps_client_timestamps(self):
+        now = timezone.now()
+        self.log_batch([
+            {'event': 'early', 'timestamp': (self.attempt.start_time - timezone.timedelta(days=1)).isoformat()},
+            {'event': 'future', 'timestamp': (now + timezone.timedelta(days=1)).isoformat()},
+        ])
+
+        timestamps = dict(ProctorLog.objects.values_list('event', 'timestamp'))
+        # Not before the attempt started, and not after the server received them
+        self.assertEqual(timestamps['early'], self.attempt.start_time)
+        self.assertGreaterEqual(timestamps['future'], now)
+        self.assertLessEqual(timestamps['future'], timezone.now())
+
+        self.assertEqual(self.client.post('/api/proctor/log/batch/', {
+            'user_id': self.student.user_id, 'exam_id': self.exam.id, 'events': [{'event': 'x', 'timestamp': 'soon'}]
+        }, content_type='application/json').status_code, 400)
+
+    def test_batch_after_submit_is_ignored(self):
+        ExamAttempt.objects.filter(id=self.attempt.id).update(is_submitted=True, violation_count=1)
+
+        data = self.log_batch([{'event': 'tab_switch'}, {'event': 'window_blur'}])
 
-# Create your tests here.
+        self.assertEqual(data['message'], "Exam already submitted")
+        self.assertEqual((data['accepted'], data['ignored'], data['violations']), (0, 2, 1))
+        self.assertTrue(data['submitted'])
+        self.assertFalse(data['auto_submitted'])
+        self.assertFalse(ProctorLog.objects.exists())
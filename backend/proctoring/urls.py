@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import log_event, get_violations
+from .views import log_event, log_event_batch, get_violations
 
 urlpatterns = [
     path('log/', log_event, name='log_event'),
+    path('log/batch/', log_event_batch, name='log_event_batch'),
     path('violations/', get_violations, name='get_violations'),
 ]
\ No newline at end of file
@@ -1,62 +1,154 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from exams.models import ExamAttempt
 from users.models import UserProfile
 from .models import ProctorLog
-from .constants import MAX_VIOLATIONS
+from .buffer import log_buffer
+from .constants import MAX_BATCH_EVENTS, MAX_VIOLATIONS
+from .violations import close_for_violations, logged_event_data, parse_event, unlogged_event_data
+
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def log_event(request):
+    try:
+        user_id, exam_id, event = parse_event(request.data)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+    attempts = ExamAttempt.objects.filter(student__user_id=user_id, exam_id=exam_id)
+
+    # Bump the counter in the database; only open attempts take new violations
+    if not attempts.filter(is_submitted=False).update(violation_count=F('violation_count') + 1):
+        return unlogged_event_response(user_id, attempts)
+
+    attempt_id, violation_count = attempts.values_list('id', 'violation_count').get()
+
+    log_buffer.add(ProctorLog(student_id=user_id, exam_id=exam_id, event=event))
+
+    # Auto-submit if violations exceed limit
+    if violation_count >= MAX_VIOLATIONS:
+        close_for_violations(attempt_id, violation_count)
+        log_buffer.flush()
+
+    return Response(logged_event_data(violation_count))
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def log_event_batch(request):
+    """
+    Log an ordered batch of client-side events in one transaction.
+
+    Body: {"user_id", "exam_id", "events": [{"event", "timestamp"}, ...]}
+    Events after the one that reaches MAX_VIOLATIONS are ignored.
+    """
     user_id = request.data.get('user_id')
     exam_id = request.data.get('exam_id')
-    event = request.data.get('event')
+    events = request.data.get('events')
 
-    if not user_id or not exam_id or not event:
-        return Response({"error": "user_id, exam_id, and event required"}, status=400)
+    if not user_id or not exam_id or not events:
+        return Response({"error": "user_id, exam_id, and events required"}, status=400)
 
     try:
-        profile = UserProfile.objects.get(user_id=user_id)
-        attempt = ExamAttempt.objects.get(student=profile, exam_id=exam_id)
-    except UserProfile.DoesNotExist:
-        return Response({"error": "User profile not found"}, status=404)
-    except ExamAttempt.DoesNotExist:
-        return Response({"error": "Exam attempt not found"}, status=404)
+        user_id = int(user_id)
+        exam_id = int(exam_id)
+    except (TypeError, ValueError):
+        return Response({"error": "Invalid user_id or exam_id"}, status=400)
 
-    if attempt.is_submitted:
-        return Response({"message": "Exam already submitted"})
+    if not isinstance(events, list):
+        return Response({"error": "events must be a list"}, status=400)
 
-    # Save violation log
-    ProctorLog.objects.create(
-        student=profile.user,
-        exam_id=exam_id,
-        event=event
-    )
-    
-    attempt.violation_count += 1
-    attempt.save()
+    if len(events) > MAX_BATCH_EVENTS:
+        return Response({"error": f"At most {MAX_BATCH_EVENTS} events per batch"}, status=400)
 
-    # Auto-submit if violations exceed limit
-    if attempt.violation_count >= MAX_VIOLATIONS:
-        attempt.is_submitted = True
-        attempt.end_time = timezone.now()
-        attempt.save()
-        return Response({
-            "message": "Violation limit exceeded. Exam auto-submitted.",
-            "auto_submitted": True,
-            "violations": attempt.violation_count
-        })
+    now = timezone.now()
+    parsed = []
+    for item in events:
+        if not isinstance(item, dict) or not item.get('event'):
+            return Response({"error": "Each event needs an event name"}, status=400)
+        try:
+            timestamp = parse_datetime(item['timestamp']) if item.get('timestamp') else now
+        except (TypeError, ValueError):
+            timestamp = None
+        if timestamp is None:
+            return Response({"error": f"Invalid timestamp: {item.get('timestamp')}"}, status=400)
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        parsed.append((item['event'], min(timestamp, now)))
+
+    attempts = ExamAttempt.objects.filter(student__user_id=user_id, exam_id=exam_id)
+
+    with transaction.atomic():
+        attempt = attempts.select_for_update(of=('self',)).only(
+            'id', 'violation_count', 'is_submitted', 'start_time'
+        ).first()
+
+        if attempt is None:
+            return unlogged_event_response(user_id, attempts)
+
+        if attempt.is_submitted:
+            return Response({
+                "message": "Exam already submitted",
+                "accepted": 0,
+                "ignored": len(parsed),
+                "violations": attempt.violation_count,
+                "remaining": max(MAX_VIOLATIONS - attempt.violation_count, 0),
+                "max_violations": MAX_VIOLATIONS,
+                "auto_submitted": False,
+                "submitted": True
+            })
+
+        # Accept events up to and including the one that hits the limit
+        room = max(MAX_VIOLATIONS - attempt.violation_count, 1)
+        accepted = parsed[:room]
+
+        ProctorLog.objects.bulk_create([
+            ProctorLog(
+                student_id=user_id,
+                exam_id=exam_id,
+                event=event,
+                timestamp=max(timestamp, attempt.start_time)
+            )
+            for event, timestamp in accepted
+        ])
+
+        ExamAttempt.objects.filter(id=attempt.id).update(
+            violation_count=F('violation_count') + len(accepted)
+        )
+        violation_count = ExamAttempt.objects.values_list(
+            'violation_count', flat=True
+        ).get(id=attempt.id)
+
+        auto_submitted = violation_count >= MAX_VIOLATIONS
+        if auto_submitted:
+            close_for_violations(attempt.id, violation_count, now)
 
     return Response({
-        "message": "Violation logged",
-        "violations": attempt.violation_count,
-        "remaining": MAX_VIOLATIONS - attempt.violation_count,
-        "auto_submitted": False
+        "message": (
+            "Violation limit exceeded. Exam auto-submitted."
+            if auto_submitted else "Violations logged"
+        ),
+        "accepted": len(accepted),
+        "ignored": len(parsed) - len(accepted),
+        "violations": violation_count,
+        "remaining": max(MAX_VIOLATIONS - violation_count, 0),
+        "max_violations": MAX_VIOLATIONS,
+        "auto_submitted": auto_submitted,
+        "submitted": auto_submitted
     })
 
 
+def unlogged_event_response(user_id, attempts):
+    data, status = unlogged_event_data(user_id, attempts)
+    return Response(data, status=status)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_violations(request):
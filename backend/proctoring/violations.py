@@ -0,0 +1,67 @@
+# proctoring/violations.py
+"""Steps shared by the sync and async proctoring views"""
+import logging
+
+from django.utils import timezone
+
+from exams.scheduler import close_attempt
+from users.models import UserProfile
+from .constants import MAX_VIOLATIONS
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_event(data):
+    """
+    (user_id, exam_id, event) from a log_event body, as ints and a name.
+    Raises ValueError with a message for the 400 response.
+    """
+    user_id = data.get('user_id')
+    exam_id = data.get('exam_id')
+    event = data.get('event')
+
+    if not user_id or not exam_id or not event:
+        raise ValueError("user_id, exam_id, and event required")
+
+    try:
+        return int(user_id), int(exam_id), event
+    except (TypeError, ValueError):
+        raise ValueError("Invalid user_id or exam_id")
+
+
+def close_for_violations(attempt_id, violation_count, now=None):
+    """Close an attempt that reached MAX_VIOLATIONS, graded from its saved answers"""
+    if close_attempt(attempt_id, now or timezone.now()):
+        logger.warning(
+            "Attempt %s auto-submitted after %d violations", attempt_id, violation_count,
+            extra={'attempt_id': attempt_id, 'violations': violation_count}
+        )
+
+
+def logged_event_data(violation_count):
+    """Response body for a logged event that brought the count to violation_count"""
+    if violation_count >= MAX_VIOLATIONS:
+        return {
+            "message": "Violation limit exceeded. Exam auto-submitted.",
+            "auto_submitted": True,
+            "violations": violation_count
+        }
+
+    return {
+        "message": "Violation logged",
+        "violations": violation_count,
+        "remaining": MAX_VIOLATIONS - violation_count,
+        "auto_submitted": False
+    }
+
+
+def unlogged_event_data(user_id, attempts):
+    """(response body, status) explaining why an event was not logged against any open attempt"""
+    if attempts.exists():
+        return {"message": "Exam already submitted"}, 200
+
+    if not UserProfile.objects.filter(user_id=user_id).exists():
+        return {"error": "User profile not found"}, 404
+
+    return {"error": "Exam attempt not found"}, 404
@@ -1,30 +1,115 @@
 # users/admin_views.py
+from urllib.parse import urlencode
+
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from backend.cache import cached
+from backend.pagination import (
+    CONTENT_TYPES, STREAM_FORMATS, CursorError, RowFileError, detect_row_format, keyset_page, page_size_from,
+    stream_rows
+)
+from backend.db_routers import current_read_alias, reporting_view
+from exams.models import parse_flag
 from .models import UserProfile
+from .provisioning import iter_rows, provision_users
+
+
+# Response field -> UserProfile column
+USER_LIST_COLUMNS = {
+    'id': 'id',
+    'user_id': 'user_id',
+    'username': 'user__username',
+    'email': 'user__email',
+    'role': 'role',
+    'department': 'department',
+    'batch': 'batch',
+    'date_joined': 'user__date_joined',
+}
+
+# Usernames are unique, so they order the list on their own, and the
+# auth_user username index serves both the ordering and prefix searches
+USER_LIST_ORDERING = ['user__username']
+
+EXPORT_CHUNK_SIZE = 2000
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@reporting_view
 def admin_user_list(request):
-    users = UserProfile.objects.select_related('user').all()
-    
-    user_data = []
-    for profile in users:
-        user_data.append({
-            'id': profile.id,
-            'user_id': profile.user.id,
-            'username': profile.user.username,
-            'email': profile.user.email,
-            'role': profile.role,
-            'department': profile.department,  
-            'batch': profile.batch,
-            'date_joined': profile.user.date_joined
-        })
-    
-    return Response(user_data)
+    """
+    One page of users in username order. Filters: role, department, batch
+    and username (a prefix). Pass the returned next cursor as ?cursor= for
+    the following page. ?export=csv|tsv|ndjson streams every matching user
+    instead.
+    """
+    filters = {
+        field: request.query_params.get(field, '').strip()
+        for field in ('role', 'department', 'batch', 'username')
+    }
+
+    export = request.query_params.get('export')
+    if export:
+        if export not in STREAM_FORMATS:
+            return Response({"error": f"export must be one of {', '.join(STREAM_FORMATS)}"}, status=400)
+
+        # The stream is read after reporting_view has returned, so pin the replica now
+        rows = user_list_queryset(filters).using(current_read_alias()).order_by(*USER_LIST_ORDERING).values_list(
+            *USER_LIST_COLUMNS.values()
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            stream_rows(list(USER_LIST_COLUMNS), rows, export), content_type=CONTENT_TYPES[export]
+        )
+        response['Content-Disposition'] = f'attachment; filename="users.{export}"'
+        return response
+
+    cursor = request.query_params.get('cursor') or None
+    try:
+        page_size = page_size_from(request.query_params)
+        page = cached(
+            'admin_user_list',
+            (urlencode(sorted({**filters, 'cursor': cursor or '', 'page_size': page_size}.items())),),
+            ('user', 'userprofile'),
+            lambda: build_admin_user_list(filters, cursor, page_size),
+        )
+    except CursorError as e:
+        return Response({"error": str(e)}, status=400)
+
+    return Response(page)
+
+
+def user_list_queryset(filters):
+    profiles = UserProfile.objects.all()
+    if filters['role']:
+        profiles = profiles.filter(role=filters['role'])
+    if filters['department']:
+        profiles = profiles.filter(department=filters['department'])
+    if filters['batch']:
+        profiles = profiles.filter(batch=filters['batch'])
+    if filters['username']:
+        profiles = profiles.filter(user__username__startswith=filters['username'])
+    return profiles
+
+
+def build_admin_user_list(filters, cursor, page_size):
+    rows, next_cursor = keyset_page(
+        user_list_queryset(filters).values(*USER_LIST_COLUMNS.values()),
+        USER_LIST_ORDERING,
+        cursor,
+        page_size,
+    )
+
+    return {
+        "results": [
+            {field: row[column] for field, column in USER_LIST_COLUMNS.items()}
+            for row in rows
+        ],
+        "next": next_cursor,
+        "page_size": page_size,
+    }
 
 
 
@@ -73,6 +158,37 @@ def admin_create_user(request):
     }, status=201)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def admin_provision_users(request):
+    """
+    Create users from an uploaded roster ('file': CSV, TSV or JSON Lines
+    with username, email, password, role, department and batch columns;
+    file_format overrides the extension). Valid rows are created and the
+    rest reported per row; dry_run only validates.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "file required"}, status=400)
+
+    try:
+        fmt = detect_row_format(upload.name, request.data.get('file_format'))
+        report = provision_users(iter_rows(upload.file, fmt), dry_run=parse_flag(request.data.get('dry_run')))
+    except RowFileError as e:
+        return Response({"error": str(e)}, status=400)
+
+    if report['dry_run']:
+        return Response({"message": f"Validated {len(report['results'])} rows", **report})
+
+    if report['skipped'] and not report['created']:
+        return Response({"error": "No users created", **report}, status=400)
+
+    return Response({
+        "message": f"Created {report['created']} users",
+        **report
+    }, status=201 if report['created'] else 200)
+
+
 @api_view(['PUT'])
 @permission_classes([AllowAny])
 def admin_update_user(request, user_id):
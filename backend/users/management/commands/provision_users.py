@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.pagination import RowFileError, detect_row_format
+from users.provisioning import iter_rows, provision_users
+
+
+class Command(BaseCommand):
+    help = "Create users and profiles in bulk from a CSV, TSV or JSON Lines roster"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Roster file")
+        parser.add_argument('--format', dest='file_format', help="csv, tsv or jsonl (default: from the extension)")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and check for collisions without creating anyone")
+        parser.add_argument('--report', help="Write the per-row results to this file as JSON Lines")
+
+    def handle(self, *args, **options):
+        try:
+            fmt = detect_row_format(options['path'], options['file_format'])
+            with open(options['path'], 'rb') as stream:
+                report = provision_users(iter_rows(stream, fmt), dry_run=options['dry_run'])
+        except (OSError, RowFileError) as e:
+            raise CommandError(str(e))
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as output:
+                for result in report['results']:
+                    output.write(json.dumps(result) + '\n')
+        else:
+            for result in report['results']:
+                if result.get('errors'):
+                    self.stderr.write(f"Row {result['row']} ({result['username']}): {'; '.join(result['errors'])}")
+
+        summary = ', '.join(f"{count} {status}" for status, count in sorted(report['counts'].items()))
+        self.stdout.write(self.style.SUCCESS(f"{summary or 'Empty roster'}"))
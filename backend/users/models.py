@@ -18,4 +18,7 @@ class UserProfile(models.Model):
 
     class Meta:
         verbose_name = "User Profile"
-        verbose_name_plural = "User Profiles"
\ No newline at end of file
+        verbose_name_plural = "User Profiles"
+        indexes = [
+            models.Index(fields=['role', 'department', 'batch'], name='profile_role_dept_batch_idx'),
+        ]
\ No newline at end of file
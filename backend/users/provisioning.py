@@ -0,0 +1,202 @@
+# users/provisioning.py
+"""
+Bulk user provisioning from a roster file.
+
+A roster is CSV, TSV or JSON Lines with one user per row. All usernames
+are checked against the database with a single IN query, passwords are
+hashed in a process pool (PBKDF2 is deliberately slow, and a semester's
+intake is thousands of hashes), and users and profiles are inserted with
+bulk_create in chunks. Every row gets an entry in the result report.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import DataError, IntegrityError, transaction
+
+from backend.cache import bump_version
+from backend.pagination import read_rows
+from .models import UserProfile
+
+
+FIELDS = ['username', 'email', 'password', 'role', 'department', 'batch']
+REQUIRED_FIELDS = ['username', 'password']
+
+ROLES = [role for role, _ in UserProfile.ROLE_CHOICES]
+
+PROVISION_CHUNK_SIZE = 500
+
+# Below this many passwords, starting worker processes costs more than it saves
+MIN_POOL_PASSWORDS = 50
+
+# Checked per row: PostgreSQL rejects an over-long value for the whole chunk
+MAX_LENGTHS = {
+    'username': User._meta.get_field('username').max_length,
+    'email': User._meta.get_field('email').max_length,
+    'department': UserProfile._meta.get_field('department').max_length,
+    'batch': UserProfile._meta.get_field('batch').max_length,
+}
+
+
+def iter_rows(stream, fmt):
+    """Yield (row number, dict) from a binary roster stream in the given format"""
+    return read_rows(stream, fmt, REQUIRED_FIELDS)
+
+
+def validate_row(row):
+    """
+    Return (user fields, errors) for one roster row, with the same rules as
+    admin_create_user plus the column lengths
+    """
+    if row is None:
+        return None, ["Not a JSON object"]
+
+    values = {}
+    for field in FIELDS:
+        value = row.get(field)
+        # Passwords are taken as given; everything else is trimmed
+        value = '' if value is None else str(value)
+        values[field] = value if field == 'password' else value.strip()
+    values['role'] = values['role'].lower() or 'student'
+
+    errors = []
+    if not values['username'] or not values['password']:
+        errors.append("Username and password required")
+
+    for field, max_length in MAX_LENGTHS.items():
+        if len(values[field]) > max_length:
+            errors.append(f"{field.capitalize()} is longer than {max_length} characters")
+
+    if values['role'] not in ROLES:
+        errors.append("Invalid role")
+    elif values['role'] == 'student' and (not values['department'] or not values['batch']):
+        errors.append("Students must have department and batch")
+    elif values['role'] == 'teacher' and not values['department']:
+        errors.append("Teachers must have department")
+
+    if values['role'] != 'student':
+        values['batch'] = ''
+
+    return (None if errors else values), errors
+
+
+def hash_passwords(passwords):
+    """make_password() for every password, spread over worker processes"""
+    workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < MIN_POOL_PASSWORDS:
+        return [make_password(password) for password in passwords]
+
+    # Workers are spawned, not forked: forking a threaded server process can
+    # copy locks other threads hold (the logging queue, connections). They
+    # start without Django configured, and only unpickle make_password,
+    # which doesn't need the app registry, before django.setup() runs.
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+    ) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def _insert_chunk(chunk):
+    """Insert (result, values) pairs and mark their results created"""
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(username=values['username'], email=values['email'], password=values['password'])
+            for _, values in chunk
+        ])
+        if any(user.pk is None for user in users):
+            # Backends without RETURNING don't set primary keys on bulk_create
+            ids = dict(User.objects.filter(
+                username__in=[user.username for user in users]
+            ).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+
+        UserProfile.objects.bulk_create([
+            UserProfile(user=user, role=values['role'], department=values['department'], batch=values['batch'])
+            for user, (_, values) in zip(users, chunk)
+        ])
+
+    for user, (result, _) in zip(users, chunk):
+        result['status'] = 'created'
+        result['user_id'] = user.pk
+
+
+def _insert_row(pair):
+    """Insert one (result, values) pair, recording why it failed if it does"""
+    result, _ = pair
+    try:
+        _insert_chunk([pair])
+    except IntegrityError:
+        result.update(status='exists', errors=["Username already exists"])
+    except DataError as e:
+        result.update(status='invalid', errors=[f"Could not be stored: {e}"])
+
+
+def provision_users(rows, dry_run=False, chunk_size=PROVISION_CHUNK_SIZE):
+    """
+    Create a user and profile for each valid row of (row number, dict).
+
+    Rows that are invalid, repeat a username earlier in the roster, or name
+    an existing user are reported and skipped; the rest are created.
+    Returns a summary with one result per row.
+    """
+    results = []
+    pending = []
+    seen = set()
+
+    for number, row in rows:
+        values, errors = validate_row(row)
+        result = {"row": number, "username": (row or {}).get('username', '')}
+        results.append(result)
+        if errors:
+            result.update(status='invalid', errors=errors)
+        elif values['username'] in seen:
+            result.update(status='duplicate', errors=["Username repeated in roster"])
+        else:
+            seen.add(values['username'])
+            result['username'] = values['username']
+            pending.append((result, values))
+
+    # One query for every collision instead of one per row
+    existing = set(User.objects.filter(username__in=seen).values_list('username', flat=True))
+    for result, _ in pending:
+        if result['username'] in existing:
+            result.update(status='exists', errors=["Username already exists"])
+    pending = [(result, values) for result, values in pending if 'status' not in result]
+
+    if dry_run:
+        for result, _ in pending:
+            result['status'] = 'valid'
+    elif pending:
+        hashes = hash_passwords([values['password'] for _, values in pending])
+        for (_, values), hashed in zip(pending, hashes):
+            values['password'] = hashed
+
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            try:
+                _insert_chunk(chunk)
+            except (IntegrityError, DataError):
+                # Someone else took a username after the pre-check, or a value
+                # didn't fit its column; insert one row at a time to find which
+                for pair in chunk:
+                    _insert_row(pair)
+
+        # bulk_create() skips the signals that keep the user list cache fresh
+        bump_version('user', 'userprofile')
+
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+
+    return {
+        "created": counts.get('created', 0),
+        "skipped": len(results) - counts.get('created', 0) - counts.get('valid', 0),
+        "counts": counts,
+        "results": results,
+        "dry_run": dry_run,
+    }
@@ -0,0 +1,22 @@
+# users/signals.py
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.cache import bump_version
+from .models import UserProfile
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def profile_changed(sender, **kwargs):
+    bump_version('userprofile')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Every login saves last_login, which no cached list shows
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    bump_version('user')
@@ -1,3 +1,135 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DataError
 from django.test import TestCase
 
-# Create your tests here.
+from backend.pagination import MAX_PAGE_SIZE
+from . import provisioning
+from .models import UserProfile
+
+
+class ProvisioningTests(TestCase):
+    def row(self, **fields):
+        return {
+            'username': 'alice', 'email': 'alice@example.com', 'password': 'pass',
+            'role': 'student', 'department': 'CS', 'batch': '2024', **fields,
+        }
+
+    def test_rejects_values_longer_than_their_columns(self):
+        for field, max_length in provisioning.MAX_LENGTHS.items():
+            value = 'x' * (max_length + 1)
+            _, errors = provisioning.validate_row(self.row(**{field: value}))
+            self.assertEqual(errors, [f"{field.capitalize()} is longer than {max_length} characters"])
+
+            values, errors = provisioning.validate_row(self.row(**{field: value[:-1]}))
+            self.assertEqual(errors, [])
+
+    def test_data_error_fails_only_the_offending_rows(self):
+        insert_chunk = provisioning._insert_chunk
+
+        def reject_bob(chunk):
+            if any(values['username'] == 'bob' for _, values in chunk):
+                raise DataError("value too long")
+            insert_chunk(chunk)
+
+        rows = enumerate([self.row(), self.row(username='bob'), self.row(username='carol')], start=2)
+        with mock.patch.object(provisioning, '_insert_chunk', side_effect=reject_bob):
+            report = provisioning.provision_users(rows)
+
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([result['status'] for result in report['results']], ['created', 'invalid', 'created'])
+        self.assertEqual(
+            set(UserProfile.objects.values_list('user__username', flat=True)), {'alice', 'carol'}
+        )
+        self.assertFalse(User.objects.filter(username='bob').exists())
+
+
+class AdminUserListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def create_user(self, username, role='student', department='CS', **fields):
+        # No password: hashing one per user would dominate the test's run time
+        user = User.objects.create_user(username=username, **fields)
+        return UserProfile.objects.create(
+            user=user, role=role, department=department, batch='2024' if role == 'student' else ''
+        )
+
+    def get_users(self, **params):
+        return self.client.get('/api/admin/users/', params)
+
+    def test_page_shape(self):
+        profile = self.create_user('alice', email='alice@example.com')
+
+        data = self.get_users(page_size=10).json()
+        self.assertEqual(set(data), {'results', 'next', 'page_size'})
+        self.assertEqual((data['next'], data['page_size']), (None, 10))
+        self.assertEqual(data['results'], [{
+            'id': profile.id, 'user_id': profile.user_id, 'username': 'alice', 'email': 'alice@example.com',
+            'role': 'student', 'department': 'CS', 'batch': '2024',
+            'date_joined': profile.user.date_joined.isoformat().replace('+00:00', 'Z'),
+        }])
+
+        self.assertEqual(self.get_users(page_size=100000).json()['page_size'], MAX_PAGE_SIZE)
+        self.assertEqual(self.get_users(page_size='lots').status_code, 400)
+        self.assertEqual(self.get_users(cursor='garbage').status_code, 400)
+
+    def test_cursors_are_stable_across_inserts(self):
+        for name in ['dave', 'bob', 'erin', 'alice', 'frank', 'carol', 'gina']:
+            self.create_user(name)
+
+        page = self.get_users(page_size=3).json()
+        usernames = [user['username'] for user in page['results']]
+        self.assertEqual(usernames, ['alice', 'bob', 'carol'])
+
+        # A user added before the cursor doesn't shift the following pages
+        self.create_user('aaron')
+        while page['next']:
+            page = self.get_users(page_size=3, cursor=page['next']).json()
+            usernames += [user['username'] for user in page['results']]
+
+        self.assertEqual(usernames, ['alice', 'bob', 'carol', 'dave', 'erin', 'frank', 'gina'])
+
+    def test_filters_apply_to_pages_and_cursors(self):
+        for name in ['tina', 'tom', 'tara']:
+            self.create_user(name, role='teacher')
+        self.create_user('tess')
+
+        page = self.get_users(role='teacher', username='t', page_size=2).json()
+        self.assertEqual([user['username'] for user in page['results']], ['tara', 'tina'])
+        page = self.get_users(role='teacher', username='t', page_size=2, cursor=page['next']).json()
+        self.assertEqual(([user['username'] for user in page['results']], page['next']), (['tom'], None))
+
+    def test_streamed_exports(self):
+        alice = self.create_user('alice', email='alice@example.com')
+        self.create_user('bob', department='EE')
+
+        response = self.get_users(export='csv', department='CS')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="users.csv"')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,user_id,username,email,role,department,batch,date_joined')
+        self.assertEqual(
+            lines[1].split(',')[:7],
+            [str(alice.id), str(alice.user_id), 'alice', 'alice@example.com', 'student', 'CS', '2024']
+        )
+        self.assertEqual(len(lines), 2)
+
+        response = self.get_users(export='ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([row['username'] for row in rows], ['alice', 'bob'])
+        self.assertEqual(rows[1]['department'], 'EE')
+
+        self.assertEqual(self.get_users(export='xml').status_code, 400)
+
+    def test_user_edits_reach_the_cached_list(self):
+        user = User.objects.create_user(username='alice', email='old@example.com', password='pass')
+        UserProfile.objects.create(user=user, role='student', department='CS', batch='2024')
+        self.assertEqual(self.client.get('/api/admin/users/').json()['results'][0]['email'], 'old@example.com')
+
+        user.email = 'new@example.com'
+        user.save()
+        self.assertEqual(self.client.get('/api/admin/users/').json()['results'][0]['email'], 'new@example.com')
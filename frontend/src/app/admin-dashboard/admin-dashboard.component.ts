@@ -11,6 +11,13 @@ export class AdminDashboardComponent implements OnInit {
   username: string = '';
   
   users: any[] = [];
+  usersNext: string | null = null;
+  userFilters: any = {
+    role: '',
+    department: '',
+    batch: '',
+    username: ''
+  };
   showUserForm = false;
   userForm: any = {
     id: null,
@@ -23,6 +30,13 @@ export class AdminDashboardComponent implements OnInit {
   };
   
   exams: any[] = [];
+  examsNext: string | null = null;
+  examFilters: any = {
+    department: '',
+    batch: '',
+    status: '',
+    created_by: ''
+  };
   showExamForm = false;
   examForm: any = {
     id: null,
@@ -30,6 +44,7 @@ export class AdminDashboardComponent implements OnInit {
     duration: 60,
     department: '',
     allowed_batch: '',
+    shuffle_questions: false,
     start_time: '',
     end_time: ''
   };
@@ -69,12 +84,35 @@ export class AdminDashboardComponent implements OnInit {
   }
 
   loadUsers() {
-    this.adminService.getUsers().subscribe({
-      next: (data) => this.users = data,
+    this.adminService.getUsers(this.userFilters).subscribe({
+      next: (page) => {
+        this.users = page.results;
+        this.usersNext = page.next;
+      },
       error: (err) => console.error('Error loading users:', err)
     });
   }
 
+  loadMoreUsers() {
+    if (!this.usersNext) return;
+    this.adminService.getUsers(this.userFilters, this.usersNext).subscribe({
+      next: (page) => {
+        this.users = [...this.users, ...page.results];
+        this.usersNext = page.next;
+      },
+      error: (err) => console.error('Error loading users:', err)
+    });
+  }
+
+  clearUserFilters() {
+    this.userFilters = { role: '', department: '', batch: '', username: '' };
+    this.loadUsers();
+  }
+
+  exportUsers(format: 'csv' | 'ndjson') {
+    window.open(this.adminService.exportUsersUrl(this.userFilters, format), '_blank');
+  }
+
   openUserForm(user?: any) {
     if (user) {
       this.userForm = { ...user };
@@ -132,10 +170,11 @@ export class AdminDashboardComponent implements OnInit {
 
   loadExams() {
     console.log('[Admin] Loading exams...');
-    this.adminService.getExams().subscribe({
-      next: (data) => {
-        console.log('[Admin] Exams loaded:', data);
-        this.exams = data;
+    this.adminService.getExams(this.examFilters).subscribe({
+      next: (page) => {
+        console.log('[Admin] Exams loaded:', page);
+        this.exams = page.results;
+        this.examsNext = page.next;
       },
       error: (err) => {
         console.error('[Admin] Error loading exams:', err);
@@ -143,6 +182,22 @@ export class AdminDashboardComponent implements OnInit {
     });
   }
 
+  loadMoreExams() {
+    if (!this.examsNext) return;
+    this.adminService.getExams(this.examFilters, this.examsNext).subscribe({
+      next: (page) => {
+        this.exams = [...this.exams, ...page.results];
+        this.examsNext = page.next;
+      },
+      error: (err) => console.error('[Admin] Error loading exams:', err)
+    });
+  }
+
+  clearExamFilters() {
+    this.examFilters = { department: '', batch: '', status: '', created_by: '' };
+    this.loadExams();
+  }
+
   openExamForm(exam?: any) {
     console.log('[Admin] Opening exam form:', exam);
     
@@ -164,6 +219,7 @@ export class AdminDashboardComponent implements OnInit {
         duration: exam.duration,
         department: exam.department,
         allowed_batch: exam.allowed_batch || '',
+        shuffle_questions: !!exam.shuffle_questions,
         start_time: startTime,
         end_time: endTime
       };
@@ -177,6 +233,7 @@ export class AdminDashboardComponent implements OnInit {
         duration: 60,
         department: '',
         allowed_batch: '',
+        shuffle_questions: false,
         start_time: this.formatDateForInput(now),
         end_time: this.formatDateForInput(weekLater)
       };
@@ -222,7 +279,8 @@ export class AdminDashboardComponent implements OnInit {
       title: this.examForm.title.trim(),
       duration: parseInt(this.examForm.duration.toString()),
       department: this.examForm.department.trim(),
-      allowed_batch: this.examForm.allowed_batch ? this.examForm.allowed_batch.trim() : ''
+      allowed_batch: this.examForm.allowed_batch ? this.examForm.allowed_batch.trim() : '',
+      shuffle_questions: !!this.examForm.shuffle_questions
     };
     
     try {
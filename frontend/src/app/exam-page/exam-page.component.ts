@@ -14,6 +14,15 @@ export class ExamPageComponent implements OnInit, OnDestroy {
   questions: any[] = [];
   answers: any = {};
 
+  // Answers changed since the last autosave, and those sent but not yet acknowledged
+  changedAnswers = new Set<string>();
+  unsavedAnswers = new Set<string>();
+  autosaveSeq = 0;
+  autosaveTimer: any = null;
+  // Only one autosave is sent at a time, so a batch can't overtake an earlier one
+  autosaveInFlight = false;
+  autosaveInterval = 10000;
+
   remainingTime = 0;
   timer: any;
 
@@ -22,6 +31,11 @@ export class ExamPageComponent implements OnInit, OnDestroy {
   maxViolations = 3;
   showWarning = false;
   warningMessage = '';
+
+  // Events are queued and sent as one batch per interval
+  pendingEvents: { event: string; timestamp: string }[] = [];
+  eventFlushTimer: any = null;
+  eventFlushInterval = 2000;
   
   // Webcam
   videoStream: MediaStream | null = null;
@@ -39,7 +53,9 @@ export class ExamPageComponent implements OnInit, OnDestroy {
     this.userId = localStorage.getItem('user_id')!;
 
     this.examService.startExam(this.examId).subscribe((res: any) => {
-      this.startTimer(res.duration);
+      this.autosaveSeq = res.autosave_seq || 0;
+      this.startTimer(res.remaining_seconds);
+      this.autosaveTimer = setInterval(() => this.autosave(), this.autosaveInterval);
     });
 
     this.examService.getQuestions(this.examId, this.userId).subscribe(data => {
@@ -56,11 +72,15 @@ export class ExamPageComponent implements OnInit, OnDestroy {
     this.setupTabSwitchDetection();
   }
 
-  startTimer(minutes: number) {
-    this.remainingTime = minutes * 60;
+  // Counts down to the server's deadline for this attempt, which survives reloads
+  // and is capped at the exam's end time
+  startTimer(seconds: number) {
+    const endsAt = Date.now() + seconds * 1000;
+    this.remainingTime = seconds;
 
     this.timer = setInterval(() => {
-      this.remainingTime--;
+      // Background tabs throttle timers, so count from the clock rather than per tick
+      this.remainingTime = Math.max(Math.round((endsAt - Date.now()) / 1000), 0);
 
       if (this.remainingTime <= 0) {
         clearInterval(this.timer);
@@ -132,18 +152,33 @@ export class ExamPageComponent implements OnInit, OnDestroy {
   }
 
   logViolation(event: string) {
-    this.proctorService.logEvent(this.userId, this.examId, event).subscribe({
+    this.pendingEvents.push({ event: event, timestamp: new Date().toISOString() });
+
+    if (!this.eventFlushTimer) {
+      this.eventFlushTimer = setTimeout(() => this.flushViolations(), this.eventFlushInterval);
+    }
+  }
+
+  flushViolations() {
+    this.eventFlushTimer = null;
+    if (this.pendingEvents.length === 0) return;
+
+    const events = this.pendingEvents;
+    this.pendingEvents = [];
+
+    this.proctorService.logEvents(this.userId, this.examId, events).subscribe({
       next: (res: any) => {
         this.violations = res.violations;
         
-        if (res.auto_submitted) {
+        if (res.auto_submitted || res.submitted) {
           alert('Maximum violations exceeded. Your exam has been automatically submitted.');
           this.stopWebcam();
           this.router.navigate(['/result', this.examId]);
         } else {
           const remaining = res.remaining;
+          const names = events.map(e => e.event).join(', ');
           this.showWarningMessage(
-            `Warning! Violation detected: ${event}. ${remaining} warning(s) remaining before auto-submission.`
+            `Warning! Violation detected: ${names}. ${remaining} warning(s) remaining before auto-submission.`
           );
         }
       },
@@ -153,6 +188,50 @@ export class ExamPageComponent implements OnInit, OnDestroy {
     });
   }
 
+  markChanged(questionId: string) {
+    this.changedAnswers.add(String(questionId));
+  }
+
+  answerPayload(questionIds: Iterable<string>) {
+    return Array.from(questionIds).map(qid => ({
+      question_id: qid,
+      selected_option: this.answers[qid]
+    }));
+  }
+
+  autosave() {
+    if (this.autosaveInFlight || this.changedAnswers.size === 0) return;
+
+    const questionIds = Array.from(this.changedAnswers);
+    this.changedAnswers.clear();
+    questionIds.forEach(qid => this.unsavedAnswers.add(qid));
+
+    const payload = {
+      user_id: this.userId,
+      seq: ++this.autosaveSeq,
+      answers: this.answerPayload(questionIds)
+    };
+
+    this.autosaveInFlight = true;
+    this.examService.autosave(this.examId, payload).subscribe({
+      next: (res: any) => {
+        this.autosaveInFlight = false;
+        if (res.stale) {
+          // Another tab or a reload saved a newer seq; resend these after it
+          this.autosaveSeq = Math.max(this.autosaveSeq, res.latest_seq || 0);
+          questionIds.forEach(qid => this.changedAnswers.add(qid));
+          return;
+        }
+        questionIds.forEach(qid => this.unsavedAnswers.delete(qid));
+      },
+      error: (err) => {
+        this.autosaveInFlight = false;
+        console.error('Error autosaving answers:', err);
+        questionIds.forEach(qid => this.changedAnswers.add(qid));
+      }
+    });
+  }
+
   showWarningMessage(message: string) {
     this.warningMessage = message;
     this.showWarning = true;
@@ -164,13 +243,12 @@ export class ExamPageComponent implements OnInit, OnDestroy {
 
   submitExam(auto = false) {
     clearInterval(this.timer);
+    clearInterval(this.autosaveTimer);
 
+    // Everything else is already saved on the server
     const payload = {
       user_id: this.userId,
-      answers: Object.keys(this.answers).map(qid => ({
-        question_id: qid,
-        selected_option: this.answers[qid]
-      }))
+      answers: this.answerPayload(new Set([...this.changedAnswers, ...this.unsavedAnswers]))
     };
 
     this.examService.submitExam(this.examId, payload).subscribe(() => {
@@ -181,6 +259,8 @@ export class ExamPageComponent implements OnInit, OnDestroy {
 
   ngOnDestroy() {
     if (this.timer) clearInterval(this.timer);
+    if (this.eventFlushTimer) clearTimeout(this.eventFlushTimer);
+    if (this.autosaveTimer) clearInterval(this.autosaveTimer);
     this.stopWebcam();
     document.removeEventListener('visibilitychange', this.handleVisibilityChange.bind(this));
   }
@@ -1,5 +1,5 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 
 @Injectable({ providedIn: 'root' })
@@ -8,8 +8,28 @@ export class AdminService {
 
   constructor(private http: HttpClient) {}
 
-  getUsers(): Observable<any[]> {
-    return this.http.get<any[]>(`${this.baseUrl}/users/`);
+  // One page of users; pass the previous page's `next` as cursor for the following one
+  getUsers(filters: any = {}, cursor: string | null = null): Observable<any> {
+    let params = this.userFilterParams(filters);
+    if (cursor) {
+      params = params.set('cursor', cursor);
+    }
+    return this.http.get<any>(`${this.baseUrl}/users/`, { params });
+  }
+
+  exportUsersUrl(filters: any, format: 'csv' | 'ndjson'): string {
+    const params = this.userFilterParams(filters).set('export', format);
+    return `${this.baseUrl}/users/?${params.toString()}`;
+  }
+
+  private userFilterParams(filters: any): HttpParams {
+    let params = new HttpParams();
+    for (const key of ['role', 'department', 'batch', 'username']) {
+      if (filters[key]) {
+        params = params.set(key, filters[key]);
+      }
+    }
+    return params;
   }
 
   createUser(userData: any): Observable<any> {
@@ -24,8 +44,18 @@ export class AdminService {
     return this.http.delete(`${this.baseUrl}/users/${userId}/delete/`);
   }
 
-  getExams(): Observable<any[]> {
-    return this.http.get<any[]>(`${this.baseUrl}/exams/`);
+  // One page of exams, newest first; filters: department, batch, status, created_by
+  getExams(filters: any = {}, cursor: string | null = null): Observable<any> {
+    let params = new HttpParams();
+    for (const key of ['department', 'batch', 'status', 'created_by']) {
+      if (filters[key]) {
+        params = params.set(key, filters[key]);
+      }
+    }
+    if (cursor) {
+      params = params.set('cursor', cursor);
+    }
+    return this.http.get<any>(`${this.baseUrl}/exams/`, { params });
   }
 
   createExam(examData: any): Observable<any> {
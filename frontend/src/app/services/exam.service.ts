@@ -21,6 +21,10 @@ export class ExamService {
     return this.http.get<any[]>(`${this.baseUrl}/${examId}/questions/?user_id=${userId}`);
   }
 
+  autosave(examId: string, payload: any) {
+    return this.http.post<any>(`${this.baseUrl}/${examId}/autosave/`, payload);
+  }
+
   submitExam(examId: string, payload: any) {
     return this.http.post(`${this.baseUrl}/${examId}/submit/`, payload);
   }
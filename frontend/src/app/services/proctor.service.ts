@@ -16,6 +16,14 @@ export class ProctorService {
     });
   }
 
+  logEvents(userId: string, examId: string, events: { event: string; timestamp: string }[]): Observable<any> {
+    return this.http.post(`${this.baseUrl}/log/batch/`, {
+      user_id: userId,
+      exam_id: examId,
+      events: events
+    });
+  }
+
   getViolations(userId: string, examId: string): Observable<any> {
     return this.http.get(`${this.baseUrl}/violations/`, {
       params: { user_id: userId, exam_id: examId }
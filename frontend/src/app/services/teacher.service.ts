@@ -1,5 +1,5 @@
 import { Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable } from 'rxjs';
 
 @Injectable({ providedIn: 'root' })
@@ -8,10 +8,18 @@ export class TeacherService {
 
   constructor(private http: HttpClient) {}
 
-  getExams(userId: string): Observable<any[]> {
-    return this.http.get<any[]>(`${this.baseUrl}/exams/`, {
-      params: { user_id: userId }
-    });
+  // One page of the teacher's exams, newest first; filters: department, batch, status
+  getExams(userId: string, filters: any = {}, cursor: string | null = null): Observable<any> {
+    let params = new HttpParams().set('user_id', userId);
+    for (const key of ['department', 'batch', 'status']) {
+      if (filters[key]) {
+        params = params.set(key, filters[key]);
+      }
+    }
+    if (cursor) {
+      params = params.set('cursor', cursor);
+    }
+    return this.http.get<any>(`${this.baseUrl}/exams/`, { params });
   }
 
   createExam(userId: string, examData: any): Observable<any> {
@@ -13,12 +13,18 @@ export class TeacherDashboardComponent implements OnInit {
   department: string = '';
   
   exams: any[] = [];
+  examsNext: string | null = null;
+  examFilters: any = {
+    batch: '',
+    status: ''
+  };
   showExamForm = false;
   examForm: any = {
     id: null,
     title: '',
     duration: 60,
     allowed_batch: '',
+    shuffle_questions: false,
     start_time: '',
     end_time: ''
   };
@@ -65,8 +71,22 @@ export class TeacherDashboardComponent implements OnInit {
   }
 
   loadExams() {
-    this.teacherService.getExams(this.userId).subscribe({
-      next: (data) => this.exams = data,
+    this.teacherService.getExams(this.userId, this.examFilters).subscribe({
+      next: (page) => {
+        this.exams = page.results;
+        this.examsNext = page.next;
+      },
+      error: (err) => console.error('Error loading exams:', err)
+    });
+  }
+
+  loadMoreExams() {
+    if (!this.examsNext) return;
+    this.teacherService.getExams(this.userId, this.examFilters, this.examsNext).subscribe({
+      next: (page) => {
+        this.exams = [...this.exams, ...page.results];
+        this.examsNext = page.next;
+      },
       error: (err) => console.error('Error loading exams:', err)
     });
   }
@@ -81,6 +101,7 @@ export class TeacherDashboardComponent implements OnInit {
         title: exam.title,
         duration: exam.duration,
         allowed_batch: exam.allowed_batch,
+        shuffle_questions: exam.shuffle_questions,
         start_time: this.formatDateForInput(startDate),
         end_time: this.formatDateForInput(endDate)
       };
@@ -93,6 +114,7 @@ export class TeacherDashboardComponent implements OnInit {
         title: '',
         duration: 60,
         allowed_batch: '',
+        shuffle_questions: false,
         start_time: this.formatDateForInput(now),
         end_time: this.formatDateForInput(weekLater)
       };